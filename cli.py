@@ -1,15 +1,21 @@
 from core.attacks import (
     decrypt_small_e_case, common_modulus_attack, decrypt_common_modulus,
-    recover_p_from_high_bits
+    recover_p_from_high_bits, recover_p_from_low_bits, recover_p_from_middle_bits,
+    hastad_broadcast_attack, stereotyped_message_attack, franklin_reiter_attack
 )
+from core.batch_gcd import find_shared_primes
+from core.boneh_durfee import BONEH_DURFEE_SCHEDULE, boneh_durfee_attack, boneh_durfee_escalate
 from core.decrypt import (
-    decrypt_standard, decrypt_with_phi, decrypt_with_d, decrypt_with_factoring
+    decrypt_multi_prime, decrypt_with_phi, decrypt_with_d, decrypt_with_factoring
 )
 from core.factoring import factor_n
+from core.key_recovery import recover_private_key
 from core.keygen import gen_keys, encrypt
-from core.utils import parse_input_int, display_decryption, check_message_length
+from core.little_d_blast import search_small_d
+from core.low_d_scan import scan_corpus
+from core.rsa_key import load_private_key
+from core.utils import parse_input_int, parse_input_int_list, display_decryption, check_message_length
 from core.wiener import wiener_attack
-import libnum
 from Crypto.PublicKey import RSA
 from Crypto.Cipher import PKCS1_OAEP
 
@@ -26,17 +32,25 @@ def run_cli():
     print("🔓 解密功能")
     print(" 4. 解密密文 - 标准模式     （输入 p, q, e, c）")
     print(" 5. 解密密文 - 已知 φ(n)    （输入 n, e, φ(n), c）")
-    print(" 6. 解密密文 - 已知私钥 d   （输入 n, d, c）")
+    print(" 6. 解密密文 - 已知私钥 d   （输入 n, d, c, 可选 e）")
     print(" 7. 解密密文 - 假设 n 为素数（输入 n, e, c）")
     print(" 8. 解密密文 - 自动分解 n   （输入 n, e, c）")
     print(" 9. 解密文件 - 自动分解 n   （输入 n, e, (p, q), file_path）")
     print("10. 共模攻击（共 e）        （输入 n1, c1, n2, c2, e）")
     print("11. 共模攻击（共 n）        （输入 n, e1, c1, e2, c2）")
     print("12. 高位泄露攻击（已知高位 p）（输入p(泄露), n, e, c）")
+    print("13. 批量共享素因子检测    （输入模数文件，每行一个 n）")
+    print("14. 广播攻击（Håstad）     （输入 e, 多组 n_i, c_i）")
+    print("15. 低位/中间位泄露攻击   （输入 n, e, c, 泄露位及其位置）")
+    print("16. 已知明文模板攻击（小 e）（输入 n, e, c, 前缀, 未知长度, 后缀）")
+    print("17. 批量低 d 扫描（Wiener）  （输入公钥文件，每行 n e）")
+    print("18. 小 d 爆破（可断点续跑）  （输入 n, e, c, d 范围）")
+    print("19. 相关消息攻击（Franklin–Reiter）（输入 n, e, c1, c2, a, b）")
+    print("20. dp / dq 泄露恢复私钥    （输入 n, e, dp 或 dq, c）")
 
     print("═" * 50)
 
-    choice = input("📌 请选择操作 (1-12): ").strip()
+    choice = input("📌 请选择操作 (1-20): ").strip()
 
     try:
         if choice == '1':
@@ -44,7 +58,8 @@ def run_cli():
             p = parse_input_int(input("🔟 输入 p: "))
             q = parse_input_int(input("🔟 输入 q: "))
             e = parse_input_int(input("🔟 输入 e: "))
-            n, phi, d = gen_keys(p, q, e)
+            extra = parse_input_int_list(input("🔟 其他素因子（多素数 RSA，逗号分隔，可留空）: "))
+            n, phi, d = gen_keys(p, q, e, extra)
             print("\n✅ 密钥生成完成：")
             print(f"🔐 n      = {n}")
             print(f"φ(n)     = {phi}")
@@ -74,8 +89,9 @@ def run_cli():
             p = parse_input_int(input("🔟 输入 p: "))
             q = parse_input_int(input("🔟 输入 q: "))
             e = parse_input_int(input("🔟 输入 e: "))
+            extra = parse_input_int_list(input("🔟 其他素因子（多素数 RSA，逗号分隔，可留空）: "))
             c = parse_input_int(input("🔐 输入密文 c: "))
-            m = decrypt_standard(p, q, e, c)
+            m = decrypt_multi_prime([p, q, *extra], e, c)
             print("\n📤 请选择解密结果显示格式：")
             print(" 1. 仅输出整数")
             print(" 2. 输出 UTF-8 文本")
@@ -96,8 +112,9 @@ def run_cli():
             print("\n🔓 解密（已知私钥 d）")
             n = parse_input_int(input("🔟 输入 n: "))
             d = parse_input_int(input("🔑 输入私钥 d: "))
+            e_input = input("🔟 输入 e（可留空；提供时先分解 n 再走 CRT）: ").strip()
             c = parse_input_int(input("🔐 输入密文 c: "))
-            m = decrypt_with_d(n, d, c)
+            m = decrypt_with_d(n, d, c, parse_input_int(e_input) if e_input else None)
             display_decryption(m)
 
         elif choice == '7':
@@ -119,7 +136,9 @@ def run_cli():
             # Step 1: 尝试小 e 攻击
             if e <= 10:
                 print(f"⚠️ 由于 e = {e} 非常小，尝试小 e 解密攻击 ...")
-                if decrypt_small_e_case(n, e, c):
+                k_input = input("📏 k 的搜索上限（m^e = c + k·n，留空默认 100000）: ").strip()
+                k_max = parse_input_int(k_input) if k_input else 100000
+                if decrypt_small_e_case(n, e, c, k_max=k_max):
                     return
 
             # Step 2: 尝试 Wiener's Attack
@@ -127,14 +146,29 @@ def run_cli():
             d = wiener_attack(e, n)
             if d:
                 print(f"✅ Wiener 攻击成功，恢复私钥 d = {d}")
-                m = pow(c, d, n)
+                m = decrypt_with_d(n, d, c, e)
                 display_decryption(m)
                 return
             else:
-                print("❌ Wiener 攻击失败，继续尝试分解 n ...")
+                print("❌ Wiener 攻击失败，尝试 Boneh–Durfee 攻击 ...")
 
-            # Step 3: 尝试分解 n
-            decrypt_with_factoring(n, e, c)
+            # Step 3: Boneh–Durfee 格攻击：先自动跑快速档 (δ=0.26, m=4)，失败后可选逐档加深（实测上限约 N^0.271，较慢）
+            d = boneh_durfee_attack(e, n)
+            if not d and e.bit_length() >= n.bit_length() // 2:
+                deeper = input("❓ 快速档失败，是否逐档加深至 δ=0.275（512 位 N 约需数分钟）[y/N]: ").strip().lower() == 'y'
+                if deeper:
+                    d = boneh_durfee_escalate(e, n, BONEH_DURFEE_SCHEDULE[1:])
+            if d:
+                print(f"✅ Boneh–Durfee 攻击成功，恢复私钥 d = {d}")
+                m = decrypt_with_d(n, d, c, e)
+                display_decryption(m)
+                return
+            else:
+                print("❌ Boneh–Durfee 攻击失败，继续尝试分解 n ...")
+
+            # Step 4: 尝试分解 n
+            race = input("❓ 是否并行竞速所有分解方法（多核时更快）[y/N]: ").strip().lower() == 'y'
+            decrypt_with_factoring(n, e, c, race=race)
 
 
         elif choice == '9':
@@ -147,27 +181,30 @@ def run_cli():
             q_input = input("🔐 输入质因子 q（可留空自动尝试）: ").strip()
 
             if p_input and q_input:
-                p = parse_input_int(p_input)
-                q = parse_input_int(q_input)
+                factors = [parse_input_int(p_input), parse_input_int(q_input)]
                 print("✅ 已输入 p 和 q，将使用它们解密文件。")
             else:
                 print("🔍 未提供 p 和 q，尝试自动分解 n ...")
-                factors = factor_n(n)
+                race = input("❓ 是否并行竞速所有分解方法（多核时更快）[y/N]: ").strip().lower() == 'y'
+                factors = factor_n(n, race=race)
                 if not factors:
                     print("❌ 分解失败，无法解密。")
                     return
-                p, q = factors
-                print(f"✅ 分解成功: p = {p}, q = {q}")
+                print(f"✅ 分解成功: {' × '.join(map(str, factors))}")
+
+            if len(factors) != 2 or factors[0] == factors[1]:
+                print("❌ OAEP 文件解密只支持两个不同素数的密钥。")
+                return
 
             try:
-                phi = (p - 1) * (q - 1)
-                d = libnum.invmod(e, phi)
+                key = load_private_key(factors, e)
             except Exception as ex:
                 print(f"❌ 无法计算私钥 d: {ex}")
                 return
 
             try:
-                private_key = RSA.construct((n, e, d, p, q))
+                p, q = factors
+                private_key = RSA.construct((n, e, int(key.d), p, q))
                 rsa = PKCS1_OAEP.new(private_key)
                 file_path = input("📂 请输入加密文件路径（如 flag.enc）: ").strip()
                 with open(file_path, 'rb') as f:
@@ -206,12 +243,103 @@ def run_cli():
             e = parse_input_int(input("🔟 输入公钥 e: "))
             c = parse_input_int(input("🔐 输入密文 c: "))
             p_high = parse_input_int(input("🧩 输入已知的 p 高位（右对齐前）: "))
-            bit_len = parse_input_int(input("📏 高位位数（如 128）: "))
+            bit_len = parse_input_int(input("📏 未知低位位数（如 128）: "))
             recover_p_from_high_bits(n, e, c, p_high, bit_len)
 
+        elif choice == '13':
+            print("\n🔍 批量 GCD：检测共享素因子的模数")
+            file_path = input("📂 请输入模数文件路径（每行一个 n）: ").strip()
+            with open(file_path, 'r') as f:
+                moduli = [parse_input_int(line) for line in f if line.strip()]
+            print(f"⏳ 共读取 {len(moduli)} 个模数，正在构造乘积树 ...")
+            results = find_shared_primes(moduli)
+            if not results:
+                print("❌ 未发现共享素因子的模数。")
+            for n, p, q in results:
+                print(f"✅ n = {n}\n   p = {p}\n   q = {q}")
+
+        elif choice == '14':
+            print("\n📡 Håstad 广播攻击（相同明文、相同小 e、不同 n）")
+            e = parse_input_int(input("🔟 输入公钥 e: "))
+            count = parse_input_int(input("🔢 密文组数（建议 >= e）: "))
+            moduli, ciphertexts = [], []
+            for i in range(1, count + 1):
+                moduli.append(parse_input_int(input(f"🔟 输入 n{i}: ")))
+                ciphertexts.append(parse_input_int(input(f"🔐 输入 c{i}: ")))
+            hastad_broadcast_attack(e, moduli, ciphertexts)
+
+        elif choice == '15':
+            print("\n🔓 低位/中间位泄露攻击：Coppersmith 恢复 p 并解密")
+            n = parse_input_int(input("🔟 输入模数 n: "))
+            e = parse_input_int(input("🔟 输入公钥 e: "))
+            c = parse_input_int(input("🔐 输入密文 c: "))
+            leak = parse_input_int(input("🧩 输入已知的 p 泄露位（右对齐后的数值）: "))
+            shift = parse_input_int(input("📏 泄露位最低位的位置（低位泄露填 0）: "))
+            known_bits = parse_input_int(input("📏 泄露位位数: "))
+            p_bits_input = input("📏 p 的位数（可留空，默认 n 的一半）: ").strip()
+            p_bits = parse_input_int(p_bits_input) if p_bits_input else None
+            if shift == 0:
+                recover_p_from_low_bits(n, e, c, leak, known_bits, p_bits)
+            else:
+                recover_p_from_middle_bits(n, e, c, leak, shift, known_bits, p_bits)
+
+        elif choice == '16':
+            print("\n🧩 已知明文模板攻击（明文 = 前缀 + 未知片段 + 后缀）")
+            n = parse_input_int(input("🔟 输入模数 n: "))
+            e = parse_input_int(input("🔟 输入公钥 e: "))
+            c = parse_input_int(input("🔐 输入密文 c: "))
+            prefix = input("💬 已知前缀（可留空）: ").encode()
+            unknown_len = parse_input_int(input("📏 未知片段字节数: "))
+            suffix = input("💬 已知后缀（可留空）: ").encode()
+            stereotyped_message_attack(n, e, c, prefix, unknown_len, suffix)
+
+        elif choice == '17':
+            print("\n🔍 批量低解密指数扫描（Wiener / Boneh–Durfee）")
+            file_path = input("📂 请输入公钥文件路径（每行 n e，或 key_to_n-e.py 输出）: ").strip()
+            out_path = input("📂 结果输出路径（默认 low_d_results.jsonl）: ").strip() or "low_d_results.jsonl"
+            use_bd = input("❓ Wiener 失败后是否再尝试 Boneh–Durfee（较慢）[y/N]: ").strip().lower() == 'y'
+            scan_corpus(file_path, out_path, boneh_durfee=use_bd)
+
+        elif choice == '18':
+            print("\n🔨 小 d 爆破（逐步乘幂，多进程并行）")
+            n = parse_input_int(input("🔟 输入 n: "))
+            e = parse_input_int(input("🔟 输入 e: "))
+            c = parse_input_int(input("🔐 输入密文 c: "))
+            d_end = parse_input_int(input("📏 d 的搜索上限（如 16777216）: "))
+            checkpoint = input("📂 检查点文件（可留空，不断点续跑）: ").strip() or None
+            d = search_small_d(n, e=e, d_end=d_end, checkpoint=checkpoint)
+            if d:
+                print(f"✅ 找到私钥 d = {d}")
+                display_decryption(decrypt_with_d(n, d, c, e))
+            else:
+                print("❌ 在给定范围内未找到 d。")
+
+        elif choice == '19':
+            print("\n🔗 Franklin–Reiter 相关消息攻击（m2 = a·m1 + b，同一 n 与 e）")
+            n = parse_input_int(input("🔟 输入模数 n: "))
+            e = parse_input_int(input("🔟 输入公钥 e: "))
+            c1 = parse_input_int(input("🔐 输入密文 c1（m1）: "))
+            c2 = parse_input_int(input("🔐 输入密文 c2（m2）: "))
+            a = parse_input_int(input("🔟 输入系数 a: "))
+            b = parse_input_int(input("🔟 输入常数 b: "))
+            franklin_reiter_attack(n, e, c1, c2, a, b)
+
+        elif choice == '20':
+            print("\n🔑 dp / dq 泄露：分解 n 并恢复完整 CRT 私钥")
+            n = parse_input_int(input("🔟 输入模数 n: "))
+            e = parse_input_int(input("🔟 输入公钥 e: "))
+            d_part = parse_input_int(input("🧩 输入泄露的 dp（或 dq）: "))
+            c = parse_input_int(input("🔐 输入密文 c: "))
+            key = recover_private_key(n, e, dp=d_part)
+            if not key:
+                print("❌ 无法由该 dp / dq 分解 n。")
+                return
+            print(f"✅ 分解成功: p = {key.p}, q = {key.q}")
+            print(f"🔑 d = {key.d}")
+            display_decryption(key.decrypt(c))
 
         else:
-            print("❌ 无效选项，请选择 1~12 之间的数字。")
+            print("❌ 无效选项，请选择 1~20 之间的数字。")
 
     except Exception as e:
         print(f"\n🚨 出现异常：{e}")
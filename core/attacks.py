@@ -1,11 +1,20 @@
 import gmpy2
+from core.batch_gcd import crt_combine
+from core.cache import remember_factors
+from core.coppersmith import (
+    factor_with_high_bits, factor_with_low_bits, factor_with_middle_bits, solve_stereotyped
+)
 from core.utils import display_decryption
 from core.decrypt import decrypt_standard
+from core.polyzn import linear_power, poly_gcd, poly_sub
+from core.rsa_key import load_private_key
+from core.small_e import search_small_e
 from core.wiener import wiener_attack
 
-def decrypt_small_e_case(n, e, c):
+def decrypt_small_e_case(n, e, c, k_max=100000, workers=None):
     """
     当 e 较小且 m^e < n 时，尝试通过 e 次整数根恢复明文。
+    否则在 [1, k_max) 中搜索 m^e = c + k*n 的 k：先用 e 次剩余筛排除绝大多数 k，再多进程并行开根。
     """
     print("\n⚡ 正在尝试小 e 解密攻击 ...")
 
@@ -17,16 +26,12 @@ def decrypt_small_e_case(n, e, c):
         return True
 
     # 否则尝试 m^e = c + k*n 的情况，寻找 k 使得根存在
-    k = 1
-    max_attempts = 100000
-    while k < max_attempts:
-        test = c + k * n
-        m_root, exact = gmpy2.iroot(test, e)
-        if exact:
-            print(f"✅ 成功找到 k = {k} 使得 (c + k*n) 可开 e 次整数根")
-            display_decryption(int(m_root))
-            return True
-        k += 1
+    found = search_small_e(n, e, c, k_max=k_max, workers=workers)
+    if found:
+        k, m = found
+        print(f"✅ 成功找到 k = {k} 使得 (c + k*n) 可开 e 次整数根")
+        display_decryption(m)
+        return True
 
     print("❌ 小 e 攻击尝试失败。")
     return False
@@ -63,36 +68,114 @@ def decrypt_common_modulus(n1, c1, n2, c2, e):
         return
 
     q = n1 // p
-    phi = (p - 1) * (q - 1)
-    d = int(gmpy2.invert(e, phi))
-    m = pow(c1, d, n1)
+    m = load_private_key((p, q), e).decrypt(c1)
 
     print(f"✅ 共模攻击成功，提取因子: p = {p}")
     display_decryption(m)
 
+def hastad_broadcast_attack(e, moduli, ciphertexts):
+    """
+    Håstad 广播攻击：同一明文用相同的小 e 在多个互素模数下加密，
+    CRT 合并得到 m^e mod ∏n_i，当 m^e < ∏n_i 时直接开 e 次整数根。
+    """
+    print(f"\n⚡ 正在尝试 Håstad 广播攻击（{len(moduli)} 组密文，e = {e}）...")
+    if len(moduli) < e:
+        print("⚠️ 密文组数少于 e，仅当明文足够短时才可能成功。")
+    try:
+        x, _ = crt_combine(ciphertexts, moduli)
+    except ValueError as ex:
+        print(f"❌ CRT 合并失败（{ex}），可改用共享素因子攻击。")
+        return None
+
+    m, exact = gmpy2.iroot(x, e)
+    if not exact:
+        print("❌ 合并结果不是完全 e 次方，广播攻击失败。")
+        return None
+    print("✅ 广播攻击成功，恢复明文如下：")
+    display_decryption(int(m))
+    return int(m)
+
+def _decrypt_with_recovered_factors(factors, e, c):
+    if not factors:
+        return False
+    p, q = factors
+    remember_factors(p * q, (p, q), "Coppersmith")
+    print(f"✅ 成功恢复 p！\np = {p}\nq = {q}")
+    m = decrypt_standard(p, q, e, c)
+    display_decryption(m)
+    return True
+
+
 def recover_p_from_high_bits(n, e, c, p_high_bits, bit_len=128):
-    print(f"\n🔍 正在尝试恢复 p，给定高 {bit_len} 位...")
-
-    high = p_high_bits << bit_len
-    low_max = 1 << bit_len
-
-    for low in range(low_max):
-        candidate_p = high | low
-        if n % candidate_p == 0:
-            p = candidate_p
-            q = n // p
-            print(f"✅ 成功恢复 p！\np = {p}\nq = {q}")
-            m = decrypt_standard(p, q, e, c)
-            display_decryption(m)
-            return True
-
-        # 可以根据需要设置更小的尝试次数以加速测试
-        if low % 1000000 == 0:
-            print(f"⏳ 已尝试低位 {low}/{low_max}")
-
-    print("❌ 未能恢复 p，请检查高位是否正确，或增加低位位数。")
+    """
+    已知 p 的高位（p_high_bits），低 bit_len 位未知：用 Coppersmith 格方法求小根，
+    p 的已知部分约占一半位数以上即可在多项式时间内恢复，不再逐个枚举低位。
+    """
+    print(f"\n🔍 正在尝试恢复 p，未知低 {bit_len} 位（Coppersmith/LLL）...")
+    factors = factor_with_high_bits(n, p_high_bits, bit_len)
+    if _decrypt_with_recovered_factors(factors, e, c):
+        return True
+    print("❌ 未能恢复 p，请检查高位是否正确，或已知位数是否不足 p 的一半。")
+    return False
+
+
+def recover_p_from_low_bits(n, e, c, p_low_bits, known_bits, p_bits=None):
+    """已知 p 的低 known_bits 位，用 Coppersmith 求高位。"""
+    print(f"\n🔍 正在尝试恢复 p，已知低 {known_bits} 位（Coppersmith/LLL）...")
+    factors = factor_with_low_bits(n, p_low_bits, known_bits, p_bits)
+    if _decrypt_with_recovered_factors(factors, e, c):
+        return True
+    print("❌ 未能恢复 p，请检查低位是否正确，或已知位数是否不足 p 的一半。")
     return False
 
+
+def recover_p_from_middle_bits(n, e, c, p_mid_bits, shift, mid_bits, p_bits=None):
+    """已知 p 从第 shift 位起的 mid_bits 位，枚举低 shift 位后用 Coppersmith 求高位。"""
+    print(f"\n🔍 正在尝试恢复 p，已知第 {shift} 位起的 {mid_bits} 位（Coppersmith/LLL）...")
+    factors = factor_with_middle_bits(n, p_mid_bits, shift, mid_bits, p_bits)
+    if _decrypt_with_recovered_factors(factors, e, c):
+        return True
+    print("❌ 未能恢复 p，请检查泄露位是否正确。")
+    return False
+
+def stereotyped_message_attack(n, e, c, prefix, unknown_len, suffix=b""):
+    """
+    已知明文模板的小 e 攻击：明文 = prefix + 未知 unknown_len 字节 + suffix。
+    用 Coppersmith 求未知片段，适用于 flag{...} 之类大部分已知的填充格式。
+    """
+    print(f"\n🧩 正在尝试已知模板攻击，未知 {unknown_len} 字节（Coppersmith/LLL）...")
+    shift = 8 * len(suffix)
+    known = (int.from_bytes(prefix, "big") << (8 * unknown_len + shift)) + int.from_bytes(suffix, "big")
+    m = solve_stereotyped(n, e, c, known, shift, 8 * unknown_len)
+    if m is None:
+        print("❌ 模板攻击失败，未知部分可能超过 n^(1/e)，或模板/长度有误。")
+        return None
+    print("✅ 成功恢复未知片段！")
+    display_decryption(m)
+    return m
+
+def franklin_reiter_attack(n, e, c1, c2, a=1, b=0):
+    """
+    Franklin–Reiter 相关消息攻击：同一模数下 m2 = a·m1 + b，c1 = m1^e，c2 = m2^e。
+    m1 同时是 x^e - c1 与 (a·x + b)^e - c2 的根，两者的 GCD 通常就是 x - m1。
+    多项式 GCD 用 half-GCD，e = 65537 也可在可接受的时间内完成。成功返回 m1，否则返回 None。
+    """
+    print(f"\n🔗 正在尝试 Franklin–Reiter 相关消息攻击（e = {e}）...")
+    g1 = [(-c1) % n] + [0] * (e - 1) + [1]
+    g2 = poly_sub(linear_power(a % n, b % n, e, n), [c2 % n], n)
+    try:
+        g = poly_gcd(g1, g2, n)
+    except ZeroDivisionError:
+        print("❌ 计算中遇到不可逆元素（n 可能有小因子），攻击失败。")
+        return None
+    if len(g) != 2:
+        print(f"❌ GCD 次数为 {len(g) - 1}，不是一次多项式，消息可能并不满足该线性关系。")
+        return None
+    m = (-g[0]) % n
+    print("✅ 成功恢复明文 m1！")
+    display_decryption(m)
+    return m
+
 def try_wiener_attack(n, e, c):
     d = wiener_attack(e, n)
     if d:
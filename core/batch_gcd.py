@@ -0,0 +1,139 @@
+import os
+import gmpy2
+from concurrent.futures import ProcessPoolExecutor
+
+# 模数数量低于该阈值时直接串行计算，进程池的序列化开销得不偿失
+PARALLEL_THRESHOLD = 2048
+
+
+# ========== 乘积树 / 余数树 ==========
+
+def _multiply(a, b):
+    return a * b
+
+
+def _reduce_square(parent, child):
+    return parent % (child * child)
+
+
+def _map(executor, func, *iterables):
+    if executor is None:
+        return list(map(func, *iterables))
+    return list(executor.map(func, *iterables, chunksize=64))
+
+
+def product_tree(values, executor=None):
+    """
+    自底向上构造乘积树，tree[0] 为叶子，tree[-1] 只有根节点（全部乘积）。
+    """
+    tree = [[gmpy2.mpz(v) for v in values]]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        half = len(level) // 2
+        parents = _map(executor, _multiply, level[0:2 * half:2], level[1:2 * half:2])
+        if len(level) % 2:
+            parents.append(level[-1])
+        tree.append(parents)
+    return tree
+
+
+def remainder_tree(tree, executor=None):
+    """
+    自顶向下计算 root mod x_i^2，返回叶子层的余数列表。
+    """
+    remainders = tree[-1]
+    for level in reversed(tree[:-1]):
+        parents = [remainders[i // 2] for i in range(len(level))]
+        remainders = _map(executor, _reduce_square, parents, level)
+    return remainders
+
+
+def batch_gcd(moduli, workers=None):
+    """
+    Bernstein 批量 GCD：对每个 n_i 计算 gcd(n_i, ∏_{j≠i} n_j)，整体为准线性复杂度。
+    workers 为进程数，None 表示按模数数量自动决定，1 表示强制串行。
+    """
+    moduli = [gmpy2.mpz(n) for n in moduli]
+    if len(moduli) < 2:
+        return [gmpy2.mpz(1)] * len(moduli)
+
+    if workers is None:
+        workers = os.cpu_count() if len(moduli) >= PARALLEL_THRESHOLD else 1
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tree = product_tree(moduli, executor)
+            remainders = remainder_tree(tree, executor)
+    else:
+        tree = product_tree(moduli)
+        remainders = remainder_tree(tree)
+
+    return [gmpy2.gcd(r // n, n) for r, n in zip(remainders, moduli)]
+
+
+# ========== 共享素因子检测 ==========
+
+def _split_full_gcd(n, candidates):
+    """gcd 等于 n 本身时（n 的两个因子都与他人共享），退回到与可疑模数两两求 gcd。"""
+    for m in candidates:
+        if m == n:
+            continue
+        g = gmpy2.gcd(n, m)
+        if 1 < g < n:
+            return g
+    return None
+
+
+def find_shared_primes(moduli, workers=None):
+    """
+    在一批模数（列表或任意可迭代对象）中找出与其他模数共享素因子的 n，
+    返回 [(n, p, q), ...]。
+    """
+    moduli = [int(n) for n in moduli]
+    gcds = batch_gcd(moduli, workers)
+    weak = [n for n, g in zip(moduli, gcds) if g != 1]
+
+    results = []
+    for n, g in zip(moduli, gcds):
+        if g == 1:
+            continue
+        if g == n:
+            g = _split_full_gcd(n, weak)
+            if g is None:
+                # 重复出现的同一模数无法借此分解
+                continue
+        p = int(g)
+        results.append((n, p, n // p))
+    return results
+
+
+# ========== 乘积树 CRT ==========
+
+def crt_combine(residues, moduli):
+    """
+    用乘积树合并 x ≡ r_i (mod n_i)（n_i 两两互素），返回 (x, N)，0 <= x < N = ∏ n_i。
+    N/n_i mod n_i 由余数树一次求出，再自底向上按 S = S_L·N_R + S_R·N_L 累加。
+    模数不互素时抛出 ValueError。
+    """
+    moduli = [gmpy2.mpz(n) for n in moduli]
+    tree = product_tree(moduli)
+    remainders = remainder_tree(tree)
+
+    values = []
+    for r, n, rem in zip(residues, moduli, remainders):
+        cofactor = (rem // n) % n
+        try:
+            values.append(gmpy2.mpz(r) * gmpy2.invert(cofactor, n) % n)
+        except ZeroDivisionError:
+            raise ValueError(f"模数不互素：gcd = {gmpy2.gcd(cofactor, n)}")
+
+    for level in tree[:-1]:
+        half = len(level) // 2
+        combined = [values[2 * i] * level[2 * i + 1] + values[2 * i + 1] * level[2 * i]
+                    for i in range(half)]
+        if len(level) % 2:
+            combined.append(values[-1])
+        values = combined
+
+    N = tree[-1][0]
+    return values[0] % N, N
@@ -0,0 +1,236 @@
+import math
+import gmpy2
+from core.cache import remember_factors
+from core.coppersmith import integer_roots, poly_mul
+from core.lattice import lll_reduce
+
+# ========== Boneh–Durfee 低解密指数攻击 ==========
+# e·d = 1 + k·φ(N)，令 A = (N+1)/2、y = -(p+q)/2、x = 2k，则 f(x, y) = 1 + x·(A + y) ≡ 0 (mod e)，
+# 且 |x| < 2·N^δ、|y| ≈ N^0.5。对 f 构造 x 移位 x^i·f^k·e^{m-k} 与 y 移位 y^j·f^k·e^{m-k}，
+# 格是下三角的；LLL 后取两个短向量求结式得到 y，从而得到 p + q。
+# 实测可恢复的上限约为 d ≈ N^0.271（理论界 N^0.292 需要更大的 m，纯 Python LLL 跑不动）：
+# 512 位 N 上 (δ, m) = (0.26, 4) 约 4 秒，(0.27, 5) 约 17 秒，(0.275, 7) 约 4 分钟；δ = 0.28、m = 6 实测失败。
+# 二元多项式用 {(x 次数, y 次数): 系数} 字典表示；Z[y] 中的元素用系数列表表示（低次在前）。
+
+# boneh_durfee_escalate 依次尝试的 (δ, m)：每一档覆盖更大的 d，耗时约为上一档的 4~15 倍
+BONEH_DURFEE_SCHEDULE = ((0.26, 4), (0.27, 5), (0.275, 7))
+
+
+def _bi_mul(f, g):
+    result = {}
+    for (a1, b1), c1 in f.items():
+        for (a2, b2), c2 in g.items():
+            key = (a1 + a2, b1 + b2)
+            result[key] = result.get(key, 0) + c1 * c2
+    return {k: c for k, c in result.items() if c}
+
+
+def _shift_polynomials(f, e, m, t):
+    """按三角顺序生成 (移位多项式, 主单项式)：x 移位按 k、i 递增，y 移位按 j、k 递增。"""
+    f_powers = [{(0, 0): gmpy2.mpz(1)}]
+    for _ in range(m):
+        f_powers.append(_bi_mul(f_powers[-1], f))
+
+    shifts = []
+    for k in range(m + 1):
+        scale = e ** (m - k)
+        for i in range(m - k + 1):
+            g = {(a + i, b): c * scale for (a, b), c in f_powers[k].items()}
+            shifts.append((g, (i + k, k)))
+    for j in range(1, t + 1):
+        for k in range(m + 1):
+            scale = e ** (m - k)
+            g = {(a, b + j): c * scale for (a, b), c in f_powers[k].items()}
+            shifts.append((g, (k, k + j)))
+    return shifts
+
+
+def _sublattice(shifts, e, m, X, Y):
+    """
+    子格优化：从后往前删除对角元大于 e^m 的"无用"向量，前提是没有其他保留向量用到它的主单项式，
+    这样删除后格仍保持三角结构，行列式下降，可达到的 δ 上界随之提高。
+    """
+    bound = e ** m
+    kept = list(shifts)
+    for idx in range(len(kept) - 1, -1, -1):
+        g, (a, b) = kept[idx]
+        if g[(a, b)] * X ** a * Y ** b <= bound:
+            continue
+        if any((a, b) in other for other, _ in kept[idx + 1:]):
+            continue
+        del kept[idx]
+    return kept
+
+
+# ---------- Z[y] 上的多项式运算 ----------
+
+def _trim(a):
+    while a and a[-1] == 0:
+        a = a[:-1]
+    return a
+
+
+def _zadd(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    return _trim([x + (b[i] if i < len(b) else 0) for i, x in enumerate(a)])
+
+
+def _zneg(a):
+    return [-x for x in a]
+
+
+def _zmul(a, b):
+    if not a or not b:
+        return []
+    return _trim(poly_mul(a, b))
+
+
+def _zpow(a, k):
+    result = [gmpy2.mpz(1)]
+    for _ in range(k):
+        result = _zmul(result, a)
+    return result
+
+
+def _zdiv_exact(a, b):
+    """Z[y] 中的整除 a / b（调用方保证整除）。"""
+    a = list(a)
+    quotient = [0] * max(len(a) - len(b) + 1, 0)
+    lead = b[-1]
+    for i in range(len(a) - len(b), -1, -1):
+        q = a[i + len(b) - 1] // lead
+        quotient[i] = q
+        if q:
+            for j, c in enumerate(b):
+                a[i + j] -= q * c
+    return _trim(quotient)
+
+
+def _xtrim(p):
+    while p and not p[-1]:
+        p = p[:-1]
+    return p
+
+
+def _prem(a, b):
+    """x 的多项式（系数在 Z[y]）的伪余式 lc(b)^{deg a - deg b + 1}·a mod b。"""
+    lead = b[-1]
+    db = len(b) - 1
+    r = list(a)
+    count = len(a) - len(b) + 1
+    while r and len(r) - 1 >= db:
+        c, shift = r[-1], len(r) - 1 - db
+        r = [_zmul(lead, x) for x in r]
+        for j, bc in enumerate(b):
+            r[j + shift] = _zadd(r[j + shift], _zneg(_zmul(c, bc)))
+        r = _xtrim(r)
+        count -= 1
+    return [_zmul(_zpow(lead, count), x) for x in r] if count > 0 else r
+
+
+def resultant_x(a, b):
+    """子结式 PRS（Cohen 算法 3.3.7，不提取容度）计算 Res_x(a, b) ∈ Z[y]。"""
+    a, b = _xtrim(a), _xtrim(b)
+    if not a or not b:
+        return []
+    sign = 1
+    if len(a) < len(b):
+        a, b = b, a
+        if (len(a) - 1) * (len(b) - 1) % 2:
+            sign = -1
+    g, h = [gmpy2.mpz(1)], [gmpy2.mpz(1)]
+    while len(b) > 1:
+        delta = len(a) - len(b)
+        if (len(a) - 1) * (len(b) - 1) % 2:
+            sign = -sign
+        r = _prem(a, b)
+        if not r:
+            return []
+        divisor = _zmul(g, _zpow(h, delta))
+        a, b = b, [_zdiv_exact(x, divisor) for x in r]
+        g = a[-1]
+        if delta:
+            h = _zdiv_exact(_zpow(g, delta), _zpow(h, delta - 1))
+    da = len(a) - 1
+    if da == 0:
+        return [x * sign for x in b[0]]
+    result = _zdiv_exact(_zpow(b[0], da), _zpow(h, da - 1))
+    return [x * sign for x in result]
+
+
+def _to_x_poly(bivariate):
+    """{(i, j): c} → 以 x 为主元、系数在 Z[y] 的多项式。"""
+    deg_x = max(i for i, _ in bivariate)
+    result = [[] for _ in range(deg_x + 1)]
+    for (i, j), c in bivariate.items():
+        coef = result[i] + [0] * max(0, j + 1 - len(result[i]))
+        coef[j] += c
+        result[i] = coef
+    return [_trim(c) for c in result]
+
+
+# ---------- 攻击主体 ----------
+
+def boneh_durfee_attack(e, n, delta=0.26, m=4, t=None, candidates=4):
+    """
+    Boneh–Durfee 攻击：假设 d < N^delta，构造参数为 (m, t) 的格（t 默认取 ⌈τ·m⌉，τ = (1 - 2δ)/2 为最优 y 移位比例）。
+    成功返回 d，失败返回 None。m 越大可覆盖的 δ 越接近 0.292，但维数与耗时急剧上升。
+    """
+    e, n = gmpy2.mpz(e), gmpy2.mpz(n)
+    # d 很小时 e 与 N 同量级；e 远小于 N 时格中不存在足够短的向量，直接放弃
+    if e.bit_length() < n.bit_length() // 2:
+        return None
+    if t is None:
+        t = math.ceil((1 - 2 * delta) / 2 * m)
+    A = (n + 1) // 2
+    X = 2 * gmpy2.mpz(gmpy2.floor(gmpy2.mpfr(n) ** delta))
+    Y = gmpy2.isqrt(n)
+    f = {(0, 0): gmpy2.mpz(1), (1, 0): A, (1, 1): gmpy2.mpz(1)}
+
+    shifts = _sublattice(_shift_polynomials(f, e, m, t), e, m, X, Y)
+    monomials = [lead for _, lead in shifts]
+    column = {mono: idx for idx, mono in enumerate(monomials)}
+    basis = []
+    for g, _ in shifts:
+        row = [0] * len(monomials)
+        for (a, b), c in g.items():
+            row[column[(a, b)]] = c * X ** a * Y ** b
+        basis.append(row)
+
+    reduced = lll_reduce(basis)
+
+    polys = []
+    for row in reduced[:candidates]:
+        p = {mono: int(v) // (X ** mono[0] * Y ** mono[1]) for mono, v in zip(monomials, row) if v}
+        if p:
+            polys.append(_to_x_poly(p))
+
+    for i in range(len(polys)):
+        for j in range(i + 1, len(polys)):
+            res = resultant_x(polys[i], polys[j])
+            if len(res) < 2:
+                continue
+            for y0 in integer_roots(res, 2 * Y):
+                s = -2 * y0                                   # p + q
+                discrim = s * s - 4 * n
+                if discrim < 0 or not gmpy2.is_square(discrim):
+                    continue
+                root = gmpy2.isqrt(discrim)
+                p, q = (s - root) // 2, (s + root) // 2
+                if p * q != n:
+                    continue
+                d = gmpy2.invert(e, (p - 1) * (q - 1))
+                remember_factors(n, (int(p), int(q)), "Boneh-Durfee")
+                return int(d)
+    return None
+
+
+def boneh_durfee_escalate(e, n, schedule=BONEH_DURFEE_SCHEDULE):
+    """按 schedule 逐档增大 (δ, m) 重试，直到恢复 d；后几档很慢，只在调用方明确需要时使用。"""
+    for delta, m in schedule:
+        print(f"⏳ Boneh–Durfee: δ = {delta}, m = {m} ...")
+        d = boneh_durfee_attack(e, n, delta=delta, m=m)
+        if d:
+            return d
+    return None
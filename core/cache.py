@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from math import prod
+import gmpy2
+
+# ========== 分解结果持久化缓存 ==========
+
+# 缓存文件位置与容量上限可通过环境变量覆盖；RSA_TOOL_CACHE 设为空字符串即关闭缓存
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".rsa_tool", "factors.sqlite3")
+DEFAULT_MAX_ENTRIES = 100000
+
+
+class FactorCache:
+    """
+    基于 SQLite 的 n -> 因子 缓存，按最近使用时间做 LRU 淘汰。
+    每次操作单独打开连接，可在 GUI 的后台线程和竞速模式的子进程中安全使用。
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS factors ("
+                " n TEXT PRIMARY KEY,"
+                " factors TEXT NOT NULL,"
+                " method TEXT,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS factors_last_used ON factors (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, n):
+        key = str(int(n))
+        with self._connect() as conn:
+            row = conn.execute("SELECT factors FROM factors WHERE n = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE factors SET last_used = ? WHERE n = ?", (time.time(), key))
+        return tuple(int(f) for f in row[0].split(","))
+
+    def put(self, n, factors, method=None):
+        factors = [int(f) for f in factors]
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO factors (n, factors, method, last_used) VALUES (?, ?, ?, ?)",
+                (str(int(n)), ",".join(map(str, factors)), method, time.time()),
+            )
+            if self.max_entries:
+                excess = conn.execute("SELECT COUNT(*) FROM factors").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM factors WHERE n IN "
+                        "(SELECT n FROM factors ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM factors").fetchone()[0]
+
+
+_cache = None
+
+
+def configure_cache(path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+    """替换默认缓存；path 为 None 时关闭缓存。"""
+    global _cache
+    _cache = FactorCache(path, max_entries) if path else False
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        path = os.environ.get("RSA_TOOL_CACHE", DEFAULT_CACHE_PATH)
+        max_entries = int(os.environ.get("RSA_TOOL_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+        try:
+            configure_cache(path or None, max_entries)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ 无法打开分解缓存，已禁用: {e}")
+            _cache = False
+    return None if _cache is False else _cache
+
+
+def lookup_factors(n):
+    cache = get_cache()
+    if cache is None:
+        return None
+    try:
+        factors = cache.get(n)
+    except sqlite3.Error:
+        return None
+    # 只接受完整的素因子分解，旧记录中的合数拆分视为未命中
+    if factors and prod(factors) == n and all(gmpy2.is_prime(f) for f in factors):
+        return factors
+    return None
+
+
+def remember_factors(n, factors, method=None):
+    """记录一次成功的分解；只写入乘积确实等于 n 的结果。"""
+    cache = get_cache()
+    if cache is None or not factors or prod(factors) != n:
+        return
+    try:
+        cache.put(n, factors, method)
+    except sqlite3.Error as e:
+        print(f"⚠️ 写入分解缓存失败: {e}")
+
@@ -0,0 +1,226 @@
+import math
+import gmpy2
+from core.lattice import lll_reduce
+from core.primes import primes_up_to
+
+# ========== Coppersmith / Howgrave-Graham 单变量小根 ==========
+# 多项式统一用系数列表表示，下标即次数（低次在前）。
+
+
+def poly_mul(f, g):
+    result = [0] * (len(f) + len(g) - 1)
+    for i, a in enumerate(f):
+        if a:
+            for j, b in enumerate(g):
+                result[i + j] += a * b
+    return result
+
+
+def poly_eval(f, x):
+    result = 0
+    for a in reversed(f):
+        result = result * x + a
+    return result
+
+
+def _poly_derivative(f):
+    return [i * a for i, a in enumerate(f)][1:]
+
+
+def integer_roots(h, bound):
+    """
+    求整系数多项式 h 在 [-bound, bound] 内的全部整数根：先在小素数 l 下找单根，
+    再用 Hensel（Newton）提升到 l^k > 2·bound，最后回代验证。
+    某个 l 下所有根都是单根时结果即完整，否则换下一个 l 继续补充。
+    """
+    while len(h) > 1 and h[-1] == 0:
+        h = h[:-1]
+    if len(h) <= 1:
+        return []
+    dh = _poly_derivative(h)
+    roots = set()
+    if h[0] == 0:
+        roots.add(0)
+
+    for l in primes_up_to(2000)[1:60]:
+        if h[-1] % l == 0:
+            continue
+        hl = [a % l for a in h]
+        dhl = [a % l for a in dh]
+        residues = [r for r in range(l) if poly_eval(hl, r) % l == 0]
+        all_simple = True
+        for r in residues:
+            if poly_eval(dhl, r) % l == 0:
+                all_simple = False
+                continue
+            x, modulus = gmpy2.mpz(r), gmpy2.mpz(l)
+            while modulus <= 2 * bound:
+                modulus *= modulus
+                x = (x - poly_eval(h, x) * gmpy2.invert(poly_eval(dh, x), modulus)) % modulus
+            if x > modulus // 2:
+                x -= modulus
+            if abs(x) <= bound and poly_eval(h, x) == 0:
+                roots.add(int(x))
+        if all_simple:
+            break
+    return sorted(roots)
+
+
+def _choose_parameters(degree, log_n, log_x, beta, max_dim):
+    """
+    按 Howgrave-Graham 条件 det(L)^{1/w}·2^{(w-1)/4}·√w < N^{βm} 选取最小维数的 (m, t)。
+    """
+    for w in range(degree + 1, max_dim + 1):
+        for m in range(1, w // degree + 1):
+            t = w - degree * m
+            if t < 0:
+                continue
+            log_det = degree * m * (m + 1) / 2 * log_n + w * (w - 1) / 2 * log_x
+            if log_det / w + (w - 1) / 4 + math.log2(w) / 2 < beta * m * log_n:
+                return m, t
+    return None
+
+
+def small_roots(f, N, beta=1.0, X=None, m=None, t=None, max_dim=60):
+    """
+    求首一多项式 f 满足 f(x0) ≡ 0 (mod b)、|x0| < X 的小根，其中 b | N 且 b >= N^β。
+    β = 1 即求模 N 的小根。返回满足条件的根列表（可能为空）。
+    """
+    N = gmpy2.mpz(N)
+    degree = len(f) - 1
+    if f[-1] != 1:
+        inv = gmpy2.invert(f[-1], N)
+        f = [a * inv % N for a in f]
+    log_n = math.log2(int(N))
+
+    if m is None or t is None:
+        params = _choose_parameters(degree, log_n, math.log2(int(X)), beta, max_dim)
+        if params is None:
+            print("⚠️ 未知量过大，超出 Coppersmith 界，使用最大维数尽力尝试。")
+            params = (max_dim // (2 * degree), max_dim - degree * (max_dim // (2 * degree)))
+        m, t = params
+
+    # 构造多项式 N^{m-i}·x^j·f^i（i < m，j < degree）与 x^j·f^m（j < t）
+    shifts = []
+    f_power = [1]
+    for i in range(m + 1):
+        if i < m:
+            for j in range(degree):
+                shifts.append([0] * j + [a * N ** (m - i) for a in f_power])
+        else:
+            for j in range(t):
+                shifts.append([0] * j + f_power)
+        f_power = poly_mul(f_power, f)
+
+    w = len(shifts)
+    basis = []
+    for g in shifts:
+        row = [0] * w
+        for j, a in enumerate(g[:w]):
+            row[j] = a * X ** j
+        basis.append(row)
+
+    reduced = lll_reduce(basis)
+
+    bound = N ** beta if beta < 1 else N
+    roots = set()
+    for row in reduced[:3]:
+        h = [int(a) // X ** j for j, a in enumerate(row)]
+        for x0 in integer_roots(h, X):
+            g = gmpy2.gcd(poly_eval(f, x0), N)
+            if g >= bound * 0.5 or g == N:
+                roots.add(x0)
+        if roots:
+            break
+    return sorted(roots)
+
+
+# ========== 部分泄露的 p：恢复完整分解 ==========
+
+def _factor_from_root(n, p_candidate):
+    p = gmpy2.gcd(p_candidate, n)
+    if 1 < p < n:
+        return int(p), int(n // p)
+    return None
+
+
+def _beta_for(n, p_bits):
+    return (p_bits - 1) / math.log2(int(n))
+
+
+def factor_with_high_bits(n, p_high, unknown_bits, p_bits=None):
+    """已知 p 的高位：p = p_high·2^k + x，x < 2^k。"""
+    n = gmpy2.mpz(n)
+    shift = gmpy2.mpz(p_high) << unknown_bits
+    p_bits = p_bits or int(shift.bit_length())
+    X = gmpy2.mpz(1) << unknown_bits
+    for x0 in small_roots([shift, 1], n, _beta_for(n, p_bits), X):
+        res = _factor_from_root(n, shift + x0)
+        if res:
+            return res
+    return None
+
+
+def factor_with_low_bits(n, p_low, known_bits, p_bits=None):
+    """已知 p 的低 known_bits 位：p = x·2^k + p_low，化为首一多项式 x + p_low·2^{-k} (mod N)。"""
+    n = gmpy2.mpz(n)
+    p_bits = p_bits or (int(n.bit_length()) + 1) // 2
+    X = gmpy2.mpz(1) << max(p_bits - known_bits, 1)
+    scale = gmpy2.mpz(1) << known_bits
+    f = [gmpy2.mpz(p_low) * gmpy2.invert(scale, n) % n, 1]
+    for x0 in small_roots(f, n, _beta_for(n, p_bits), X):
+        res = _factor_from_root(n, x0 * scale + p_low)
+        if res:
+            return res
+    return None
+
+
+def factor_with_middle_bits(n, p_mid, shift, mid_bits, p_bits=None, max_brute_bits=12):
+    """
+    已知 p 的中间一段：p = x_h·2^{shift+mid_bits} + p_mid·2^{shift} + x_l。
+    单变量格无法同时解出两段未知量，这里枚举较短的低位段 x_l（不超过 max_brute_bits 位），
+    对每个候选用高位泄露的方式求解 x_h。
+    """
+    n = gmpy2.mpz(n)
+    p_bits = p_bits or (int(n.bit_length()) + 1) // 2
+    if shift > max_brute_bits:
+        print(f"❌ 低位未知 {shift} 位，超过可枚举上限 {max_brute_bits} 位。")
+        return None
+    high_unknown = p_bits - shift - mid_bits
+    if high_unknown <= 0:
+        return _factor_from_root(n, gmpy2.mpz(p_mid) << shift)
+    scale = gmpy2.mpz(1) << shift
+    X = gmpy2.mpz(1) << high_unknown
+    step = gmpy2.mpz(1) << (shift + mid_bits)
+    inv = gmpy2.invert(step, n)
+    beta = _beta_for(n, p_bits)
+    for x_l in range(1 << shift):
+        known = gmpy2.mpz(p_mid) * scale + x_l
+        f = [known * inv % n, 1]
+        for x0 in small_roots(f, n, beta, X):
+            res = _factor_from_root(n, x0 * step + known)
+            if res:
+                return res
+    return None
+
+
+# ========== 已知模板的明文（stereotyped message） ==========
+
+def solve_stereotyped(n, e, c, known, shift, unknown_bits):
+    """
+    明文形如 m = known + x·2^shift，x < 2^unknown_bits 未知：
+    对 f(x) = (known + x·2^shift)^e - c 求模 n 的小根（β = 1），
+    e 较小时只要未知部分不超过约 n^{1/e} 即可恢复。返回 m 或 None。
+    """
+    n = gmpy2.mpz(n)
+    base = [gmpy2.mpz(known) % n, gmpy2.mpz(1) << shift]
+    f = [1]
+    for _ in range(e):
+        f = [a % n for a in poly_mul(f, base)]
+    f[0] = (f[0] - c) % n
+    X = gmpy2.mpz(1) << unknown_bits
+    for x0 in small_roots(f, n, 1.0, X):
+        m = gmpy2.mpz(known) + (gmpy2.mpz(x0) << shift)
+        if gmpy2.powmod(m, e, n) == c % n:
+            return int(m)
+    return None
@@ -1,26 +1,58 @@
+from functools import lru_cache
 import gmpy2
 from core.factoring import factor_n
+from core.key_recovery import factor_from_phi, recover_private_key
+from core.nthroot import decrypt_non_coprime
+from core.rsa_key import load_private_key
 from core.utils import display_decryption
 
 
 def decrypt_standard(p, q, e, c):
-    phi = (p - 1) * (q - 1)
-    d = int(gmpy2.invert(e, phi))
-    return pow(c, d, p * q)
+    return decrypt_multi_prime((p, q), e, c)
+
+def decrypt_multi_prime(factors, e, c):
+    """
+    多素数 / 素数幂模数：factors 为素因子列表（含重数），Garner CRT 解密。
+    gcd(e, φ) ≠ 1 时私钥不存在，改为逐素数开 e 次方根，返回可读性最高的候选明文。
+    """
+    try:
+        return load_private_key(factors, e).decrypt(c)
+    except ZeroDivisionError:
+        return _decrypt_by_roots(factors, e, c)
+
+def _decrypt_by_roots(factors, e, c):
+    print("⚠️ gcd(e, φ(n)) ≠ 1，私钥 d 不存在，改用模素数开 e 次方根 + CRT ...")
+    candidates = decrypt_non_coprime(factors, e, c)
+    if not candidates:
+        raise ValueError("c 在某个素因子下不是 e 次剩余，无解")
+    for i, m in enumerate(candidates[1:], 2):
+        print(f"   候选 {i}: {m}")
+    return candidates[0]
+
+@lru_cache(maxsize=64)
+def _private_exponent(e, phi):
+    return gmpy2.invert(e, phi)
 
 def decrypt_with_phi(n, e, phi, c):
-    d = int(gmpy2.invert(e, phi))
-    return pow(c, d, n)
+    """由 φ(n) 分解 n 后走 CRT（gcd(e, φ) ≠ 1 时逐素数开根）；分解失败时退回 c^d mod n。"""
+    factors = factor_from_phi(n, phi)
+    if factors:
+        return decrypt_multi_prime(factors, e, c)
+    return int(gmpy2.powmod(c, _private_exponent(e, phi), n))
 
-def decrypt_with_d(n, d, c):
+def decrypt_with_d(n, d, c, e=None):
+    """已知 e 时先由 (n, e, d) 恢复 CRT 私钥（按参数缓存），否则直接 c^d mod n。"""
+    if e is not None:
+        key = recover_private_key(n, e, d=d)
+        if key:
+            return key.decrypt(c)
     return pow(c, d, n)
 
-def decrypt_with_factoring(n, e, c):
-    factors = factor_n(n)
+def decrypt_with_factoring(n, e, c, race=False):
+    factors = factor_n(n, race=race)
     if not factors:
         print("❌ 无法分解 n，解密失败。")
         return
-    p, q = factors
-    print(f"🔓 分解结果: p = {p}, q = {q}")
-    m = decrypt_standard(p, q, e, c)
+    print(f"🔓 分解结果: {' × '.join(map(str, factors))}")
+    m = decrypt_multi_prime(factors, e, c)
     display_decryption(m)
\ No newline at end of file
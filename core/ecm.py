@@ -0,0 +1,199 @@
+import os
+import random
+import time
+import gmpy2
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import Manager
+from core.primes import primes_up_to, iter_primes
+
+# ========== Lenstra ECM（Montgomery 曲线，射影 X:Z 坐标） ==========
+
+class _FactorFound(Exception):
+    """曲线构造过程中求逆失败，恰好得到 n 的因子。"""
+
+    def __init__(self, factor):
+        super().__init__(factor)
+        self.factor = factor
+
+
+def _xdbl(x, z, a24, n):
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _xadd(x1, z1, x2, z2, xd, zd, n):
+    """差分加法：已知 P1 - P2 = Pd，求 P1 + P2。"""
+    u = (x1 - z1) * (x2 + z2) % n
+    v = (x1 + z1) * (x2 - z2) % n
+    s, d = u + v, u - v
+    return zd * s * s % n, xd * d * d % n
+
+
+def _ladder(x, z, k, a24, n):
+    """Montgomery 阶梯计算 k·P。"""
+    if k == 1:
+        return x, z
+    x1, z1 = x, z
+    x2, z2 = _xdbl(x, z, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == '1':
+            x1, z1 = _xadd(x2, z2, x1, z1, x, z, n)
+            x2, z2 = _xdbl(x2, z2, a24, n)
+        else:
+            x2, z2 = _xadd(x2, z2, x1, z1, x, z, n)
+            x1, z1 = _xdbl(x1, z1, a24, n)
+    return x1, z1
+
+
+def _suyama_curve(sigma, n):
+    """Suyama 参数化：返回 (a24, X0, Z0)，曲线群阶必含因子 12。"""
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x0 = gmpy2.powmod(u, 3, n)
+    z0 = gmpy2.powmod(v, 3, n)
+    denominator = 16 * x0 * v % n
+    try:
+        inv = gmpy2.invert(denominator, n)
+    except ZeroDivisionError:
+        raise _FactorFound(gmpy2.gcd(denominator, n))
+    a24 = gmpy2.powmod(v - u, 3, n) * (3 * u + v) % n * inv % n
+    return a24, x0, z0
+
+
+def _stage1(x, z, a24, n, B1, stop_event=None, block_size=128):
+    primes = primes_up_to(B1 + 1)
+    for i in range(0, len(primes), block_size):
+        if stop_event is not None and stop_event.is_set():
+            return None
+        k = gmpy2.mpz(1)
+        for p in primes[i:i + block_size]:
+            pk = p
+            while pk * p <= B1:
+                pk *= p
+            k *= pk
+        x, z = _ladder(x, z, k, a24, n)
+    return x, z
+
+
+def _stage2(x, z, a24, n, B1, B2, stop_event=None, D=2310, gcd_interval=1024):
+    """
+    大步小步第二阶段：q = kD ± j 时累乘 X_{kD}·Z_j - X_j·Z_{kD}，
+    kD·Q 与 ±j·Q 在模 p 下重合即可得到因子。
+    """
+    # 小步：奇数 j·Q（j <= D/2，与 D 互素）
+    baby = {1: (x, z)}
+    x2, z2 = _xdbl(x, z, a24, n)
+    prev_x, prev_z = x, z
+    cur_x, cur_z = _xadd(x2, z2, x, z, x, z, n)
+    for j in range(3, D // 2 + 1, 2):
+        if gmpy2.gcd(j, D) == 1:
+            baby[j] = (cur_x, cur_z)
+        cur_x, cur_z, prev_x, prev_z = (*_xadd(cur_x, cur_z, x2, z2, prev_x, prev_z, n), cur_x, cur_z)
+
+    # 大步：R = kD·Q，用差分加法 R + DQ（差为 (k-1)D·Q）前进
+    dx, dz = _ladder(x, z, D, a24, n)
+    k = max((B1 + D // 2) // D, 1)
+    rx, rz = _ladder(x, z, k * D, a24, n)
+    if k > 1:
+        px, pz = _ladder(x, z, (k - 1) * D, a24, n)
+    else:
+        px, pz = None, None
+
+    acc = gmpy2.mpz(1)
+    last_pair = None
+    count = 0
+    for q in iter_primes(B2 + 1, start=B1 + 1):
+        qk = (q + D // 2) // D
+        while k < qk:
+            if px is None:
+                nx, nz = _xdbl(rx, rz, a24, n)
+            else:
+                nx, nz = _xadd(rx, rz, dx, dz, px, pz, n)
+            px, pz, rx, rz = rx, rz, nx, nz
+            k += 1
+        j = abs(q - k * D)
+        if (k, j) == last_pair or j not in baby:
+            continue
+        last_pair = (k, j)
+        bx, bz = baby[j]
+        acc = acc * (rx * bz - bx * rz) % n
+        count += 1
+        if count % gcd_interval == 0:
+            if gmpy2.gcd(acc, n) != 1:
+                break
+            if stop_event is not None and stop_event.is_set():
+                return gmpy2.mpz(1)
+    return gmpy2.gcd(acc, n)
+
+
+def _run_curve(n, sigma, B1, B2, stop_event=None):
+    """跑一条曲线（第一、二阶段），成功返回非平凡因子，否则返回 None。"""
+    n = gmpy2.mpz(n)
+    try:
+        a24, x, z = _suyama_curve(gmpy2.mpz(sigma), n)
+    except _FactorFound as found:
+        return int(found.factor) if 1 < found.factor < n else None
+
+    point = _stage1(x, z, a24, n, B1, stop_event)
+    if point is None:
+        return None
+    x, z = point
+    g = gmpy2.gcd(z, n)
+    if 1 < g < n:
+        return int(g)
+    if g == n or B2 <= B1:
+        return None
+
+    g = _stage2(x, z, a24, n, B1, B2, stop_event)
+    return int(g) if 1 < g < n else None
+
+
+def ecm_factor(n, B1=50000, curves=100, B2=None, workers=None, timeout=None):
+    """
+    椭圆曲线分解：每条曲线相互独立，默认分散到进程池中并行运行，
+    任一曲线找到因子后立即通知其余进程停止并取消排队中的曲线。
+    B1 / curves 决定可找到的因子规模（B1=50000 约对应 25 位十进制因子）；
+    timeout 秒后不再开始新曲线，并通知正在运行的曲线停止。
+    """
+    n = gmpy2.mpz(n)
+    if n % 2 == 0:
+        return (2, int(n // 2)) if n > 2 else None
+    if n < 4 or gmpy2.is_prime(n):
+        return None
+    if B2 is None:
+        B2 = 100 * B1
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    sigmas = [random.randrange(6, 1 << 63) for _ in range(curves)]
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    if workers <= 1:
+        for sigma in sigmas:
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            p = _run_curve(n, sigma, B1, B2)
+            if p:
+                return p, int(n // p)
+        return None
+
+    with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+        stop_event = manager.Event()
+        pending = {executor.submit(_run_curve, int(n), sigma, B1, B2, stop_event) for sigma in sigmas}
+        try:
+            while pending:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    return None
+                for future in done:
+                    p = future.result()
+                    if p:
+                        return p, int(n // p)
+        finally:
+            stop_event.set()
+            for future in pending:
+                future.cancel()
+    return None
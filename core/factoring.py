@@ -1,54 +1,320 @@
+import multiprocessing
+import os
+import signal
+import time
+from functools import partial
+from math import prod
+from queue import Empty
 import gmpy2
+from core.batch_gcd import product_tree
+from core.cache import lookup_factors, remember_factors
+from core.ecm import ecm_factor
+from core.pollard import pollard_rho_brent, pollard_pm1, williams_pp1
+from core.primes import prime_blocks
+from core.siqs import siqs_factor
+from core.squfof import squfof
 from external.yafu import yafu_factor
 from external.factordb import factordb_lookup
 
 # ========== n 分解方法 ==========
-def fermat_factor(n):
-    a = gmpy2.isqrt(n)
-    if a * a < n:
-        a += 1
-    b2 = a * a - n
-    while not gmpy2.is_square(b2):
-        a += 1
-        b2 = a * a - n
-        if a - gmpy2.isqrt(n) > 1000000:
+
+# 试除上界的上限（约 100 万个素数，素数表与块乘积缓存约 12 MB）
+TRIAL_DIVISION_MAX_LIMIT = 1 << 24
+
+# Fermat 轮子所用的两两互素小模数：a^2 - n 模这些数必须是平方剩余
+FERMAT_WHEEL_MODULI = (64, 63, 65, 11)
+_SQUARE_RESIDUES = {m: frozenset(x * x % m for x in range(m)) for m in FERMAT_WHEEL_MODULI}
+
+
+def _fermat_wheel(n):
+    """
+    返回 (W, residues)：只有 a mod W 落在 residues 中时，a^2 - n 才可能是完全平方数。
+    各小模数的允许余数用 CRT 合并，避免遍历整个 W。
+    """
+    wheel, residues = 1, [0]
+    for m in FERMAT_WHEEL_MODULI:
+        squares = _SQUARE_RESIDUES[m]
+        nm = n % m
+        allowed = [a for a in range(m) if (a * a - nm) % m in squares]
+        inv = pow(wheel, -1, m)
+        residues = [r + wheel * ((a - r) * inv % m) for r in residues for a in allowed]
+        wheel *= m
+    residues.sort()
+    return wheel, residues
+
+
+def fermat_factor(n, max_steps=1000000, timeout=None):
+    """
+    筛选版 Fermat 分解：按轮子一次跨越多个剩余类，只对通过平方剩余过滤的 a 调用 is_square。
+    max_steps 为 a 从 ceil(sqrt(n)) 起最多前进的步数，timeout 为秒数上限（None 不限时）。
+    """
+    n = gmpy2.mpz(n)
+    a0 = gmpy2.isqrt(n)
+    if a0 * a0 < n:
+        a0 += 1
+    limit = a0 + max_steps
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    wheel, residues = _fermat_wheel(int(n))
+    if not residues:
+        return None
+
+    base = a0 - a0 % wheel
+    while base <= limit:
+        for r in residues:
+            a = base + r
+            if a < a0:
+                continue
+            if a > limit:
+                return None
+            b2 = a * a - n
+            if gmpy2.is_square(b2):
+                b = gmpy2.isqrt(b2)
+                if a - b > 1:
+                    return int(a - b), int(a + b)
+        base += wheel
+        if deadline is not None and time.monotonic() > deadline:
             return None
-    b = gmpy2.isqrt(b2)
-    p = a - b
-    q = a + b
-    return int(p), int(q)
+    return None
+
+def lehman_factor(n, k_max=20000, a_window=16, timeout=None):
+    """
+    Lehman 分解：对乘数 k = 1..k_max 检查 a^2 - 4kn 是否为完全平方数，
+    a 从 ceil(sqrt(4kn)) 起最多前进 min(a_window, n^(1/6) / (4·sqrt(k))) 步。
+    p/q 接近小分数 u/v 时在 k = uv 处几乎立即命中（Fermat 只覆盖 u = v = 1）。
+    当 k_max 足以覆盖 n^(1/3) 时先试除到 n^(1/3) 并放开 a 的窗口，即完整的 O(n^(1/3)) 算法。
+    """
+    n = gmpy2.mpz(n)
+    cube_root = gmpy2.iroot(n, 3)[0] + 1
+    sixth_root = gmpy2.iroot(n, 6)[0] + 1
+    complete = cube_root <= k_max
+    if complete:
+        found = trial_division(n, int(cube_root))
+        if found:
+            return found
+        k_max = int(cube_root)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    for k in range(1, k_max + 1):
+        four_kn = 4 * k * n
+        a = gmpy2.isqrt(four_kn)
+        if a * a < four_kn:
+            a += 1
+        steps = sixth_root // (4 * gmpy2.isqrt(k)) + 1
+        if not complete:
+            steps = min(steps, a_window)
+        b2 = a * a - four_kn
+        for _ in range(int(steps) + 1):
+            if gmpy2.is_square(b2):
+                g = gmpy2.gcd(a + gmpy2.isqrt(b2), n)
+                if 1 < g < n:
+                    return int(g), int(n // g)
+            b2 += 2 * a + 1             # (a+1)^2 - a^2
+            a += 1
+        if deadline is not None and k % 1024 == 0 and time.monotonic() > deadline:
+            return None
+    return None
+
+
+def hart_one_line(n, max_multiplier=200000, premultiplier=1, timeout=None):
+    """
+    Hart 单行分解（One Line Factoring）：s = ceil(sqrt(M·i·n))，若 s^2 mod n 为完全平方数 t^2，
+    则 gcd(s - t, n) 给出因子。p/q 接近小分数时对应的 i 很小；premultiplier 即 M（常用 480）。
+    """
+    n = gmpy2.mpz(n)
+    step = n * premultiplier
+    ni = gmpy2.mpz(0)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for i in range(1, max_multiplier + 1):
+        ni += step
+        s = gmpy2.isqrt(ni)
+        if s * s != ni:
+            s += 1
+        m = s * s % n
+        if gmpy2.is_square(m):
+            g = gmpy2.gcd(s - gmpy2.isqrt(m), n)
+            if 1 < g < n:
+                return int(g), int(n // g)
+        if deadline is not None and i % 4096 == 0 and time.monotonic() > deadline:
+            return None
+    return None
+
+def _smallest_prime_divisor(primes, n):
+    """沿该块素数的乘积树向下，只进入与 n 有公因子的子树，返回块内最小的素因子。"""
+    tree = product_tree(primes)
+    index = 0
+    for level in reversed(tree[:-1]):
+        left = 2 * index
+        if gmpy2.gcd(n, level[left]) > 1 or left + 1 >= len(level):
+            index = left
+        else:
+            index = left + 1
+    return int(tree[0][index])
+
 
 def trial_division(n, limit=1000000):
-    for i in range(2, limit):
-        if n % i == 0:
-            return i, n // i
+    """
+    分块素数乘积 GCD 试除：每块只做一次 gcd(n, ∏p)，只有 gcd 非平凡时才下钻定位因子。
+    limit 上限为 TRIAL_DIVISION_MAX_LIMIT：首次调用需筛素数并建块乘积（2^24 约 1.5 秒，
+    之后每次约 20 毫秒），更大的界内存与建表时间线性增长，这类因子应交给 rho / ECM。
+    """
+    if limit > TRIAL_DIVISION_MAX_LIMIT:
+        print(f"⚠️ 试除上界 {limit} 过大，截断为 {TRIAL_DIVISION_MAX_LIMIT}。")
+        limit = TRIAL_DIVISION_MAX_LIMIT
+    n = gmpy2.mpz(n)
+    for primes, product in prime_blocks(limit):
+        if gmpy2.gcd(n, product) == 1:
+            continue
+        p = _smallest_prime_divisor(primes, n)
+        if p != n:
+            return p, int(n // p)
     return None
 
-def factor_n(n):
-    print("\n🔍 正在尝试分解 n ...")
+# 进程内各阶段的时间预算（秒），保证普通密钥很快走到 YAFU / FactorDB
+STAGE_TIMEOUT = 10
+ECM_TIMEOUT = 60
+SIQS_TIMEOUT = 120
+SIQS_MAX_DIGITS = 55          # 纯 Python SIQS 单核约 85 秒可完成的规模
 
-    res = fermat_factor(n)
-    if res:
-        print("✅ Fermat 分解成功。")
-        return res
+# 分解流水线：依次尝试的 (名称, 方法)，每个方法接收 n，成功返回乘积为 n 的因子元组
+# （如 (p, q)，不要求都是素数），失败返回 None。新的分解算法只需在此注册即可参与 factor_n。
+# 纯 Python 的 ECM 与 YAFU 做的是同一件事且慢得多，因此排在 YAFU / FactorDB 之后作为离线兜底。
+FACTOR_STAGES = [
+    ("Fermat", fermat_factor),
+    ("Hart OLF", hart_one_line),
+    ("Lehman", lehman_factor),
+    ("试除法", trial_division),
+    ("SQUFOF", squfof),
+    ("Pollard rho", partial(pollard_rho_brent, timeout=STAGE_TIMEOUT)),
+    ("Pollard p-1", partial(pollard_pm1, timeout=STAGE_TIMEOUT)),
+    ("Williams p+1", partial(williams_pp1, timeout=STAGE_TIMEOUT)),
+    ("YAFU", yafu_factor),
+    ("FactorDB", factordb_lookup),
+    ("ECM", partial(ecm_factor, B1=11000, curves=50, timeout=ECM_TIMEOUT)),
+    ("SIQS", partial(siqs_factor, max_digits=SIQS_MAX_DIGITS, workers=os.cpu_count(), timeout=SIQS_TIMEOUT)),
+]
 
-    print("❗ Fermat 分解失败，尝试试除法 ...")
-    res = trial_division(n)
-    if res:
-        print("✅ 试除成功。")
-        return res
 
-    print("❗ 试除失败，尝试调用 YAFU 工具分解（如配置正确） ...")
-    res = yafu_factor(n)
-    if res:
-        print("✅ YAFU 分解成功。")
-        return res
+def _race_worker(name, method, n, queue):
+    # 独立进程组，便于竞速结束时连同 YAFU / ECM 启动的子进程一起结束
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    start = time.monotonic()
+    try:
+        res = method(n)
+    except Exception:
+        res = None
+    queue.put((name, res, time.monotonic() - start))
+
+
+def _kill_worker(process):
+    if not process.is_alive():
+        return
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.terminate()
+    process.join()
+
+
+def race_factor_n(n, stages=None, timeout=None):
+    """
+    竞速模式：每种分解方法各占一个进程同时运行，采用第一个乘积验证通过的分解，其余进程立即结束。
+    返回 (res, winner, timings)，timings 记录每种方法的耗时（被结束的方法记录到结束时为止）。
+    """
+    print("\n🏁 竞速模式：并行尝试所有分解方法 ...")
+    stages = stages or FACTOR_STAGES
+    queue = multiprocessing.Queue()
+    start = time.monotonic()
+    workers = {}
+    for name, method in stages:
+        process = multiprocessing.Process(target=_race_worker, args=(name, method, n, queue))
+        process.start()
+        workers[name] = process
+
+    res, winner, timings = None, None, {}
+    deadline = None if timeout is None else start + timeout
+    while len(timings) < len(workers):
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            break
+        try:
+            name, candidate, elapsed = queue.get(timeout=remaining)
+        except Empty:
+            break
+        timings[name] = elapsed
+        if candidate and len(candidate) > 1 and prod(candidate) == n:
+            res, winner = candidate, name
+            break
+
+    for name, process in workers.items():
+        _kill_worker(process)
+        timings.setdefault(name, time.monotonic() - start)
 
-    print("❗ YAFU 失败，尝试使用 FactorDB API 分解 ...")
-    res = factordb_lookup(n)
+    for name, _ in stages:
+        mark = "🏆" if name == winner else "⏱"
+        print(f"{mark} {name}: {timings[name]:.2f} s")
     if res:
-        print("✅ FactorDB 分解成功。")
-        return res
+        print(f"✅ {winner} 率先分解成功。")
+    return res, winner, timings
+
+
+def _run_stages(n, stages):
+    for name, method in stages:
+        print(f"⏳ 尝试 {name} 分解 ...")
+        res = method(n)
+        if res and len(res) > 1 and prod(res) == n:
+            print(f"✅ {name} 分解成功。")
+            return res, name
+        print(f"❗ {name} 分解失败。")
+    return None, None
+
+
+def factor_n(n, stages=None, race=False, use_cache=True):
+    """
+    完整分解 n，返回升序的素因子列表（含重数，支持多素数与素数幂模数），失败返回 None。
+    先查持久化缓存，未命中再按 FACTOR_STAGES 依次（或 race=True 时并行竞速）尝试；
+    某一阶段只拆出合数部分时，继续递归分解，完整结果写入缓存。
+    """
+    n = int(n)
+    if use_cache:
+        cached = lookup_factors(n)
+        if cached:
+            print("✅ 命中分解缓存，跳过分解。")
+            return list(cached)
+
+    if gmpy2.is_prime(n):
+        print("⚠️ n 本身是素数。")
+        return [n]
+
+    if race:
+        parts, name, _ = race_factor_n(n, stages)
+    else:
+        print("\n🔍 正在尝试分解 n ...")
+        parts, name = _run_stages(n, stages or FACTOR_STAGES)
+
+    if not parts:
+        print("❌ 所有方法均失败，无法分解 n。")
+        return None
+
+    factors = []
+    for part in parts:
+        part = int(part)
+        if part == 1:
+            continue
+        if gmpy2.is_prime(part):
+            factors.append(part)
+            continue
+        print(f"🔁 继续分解合数因子 {part} ...")
+        sub = factor_n(part, stages, race=race, use_cache=use_cache)
+        if not sub:
+            print("❌ 只得到部分分解，无法完整分解 n。")
+            return None
+        factors.extend(sub)
 
-    print("❌ 所有方法均失败，无法分解 n。")
-    return None
\ No newline at end of file
+    factors.sort()
+    remember_factors(n, factors, name)
+    return factors
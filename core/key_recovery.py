@@ -0,0 +1,135 @@
+import random
+from functools import lru_cache
+import gmpy2
+from core.cache import remember_factors
+from core.rsa_key import load_private_key
+
+# ========== 由部分私钥材料恢复完整 CRT 私钥 ==========
+# 只知道 d 或 φ(n) 时每次解密都是一次全长模幂；先由它们分解 n，再交给 load_private_key
+# 构造 CRT 私钥，之后的密文都走 CRT 快速路径。
+#   (n, e, d)：k = e·d - 1 是 λ(n) 的倍数，随机底数 g 的 g^(k/2^i) 序列中出现非平凡的 1 的平方根；
+#              素数幂 p^a（a ≥ 2）则有 p | λ(p^a) | k，由 gcd(n, k) 拆出
+#   φ(n)：双素数时 p + q = n - φ + 1，解一元二次方程；多素数时 φ 同样是 λ(n) 的倍数，走上一条路线
+#   dp / dq：e·dp ≡ 1 (mod p-1)，故 w^(e·dp) ≡ w (mod p)，p = gcd(w^(e·dp) - w, n)
+
+MAX_ATTEMPTS = 100
+WITNESSES = (2, 3, 5, 7, 11)
+
+
+def _split_with_multiple(n, k, attempts=MAX_ATTEMPTS):
+    """k 为 λ(n) 的倍数时随机拆出 n 的一个非平凡因子，失败返回 None。"""
+    n = gmpy2.mpz(n)
+    if n % 2 == 0:
+        return gmpy2.mpz(2)
+    # 素数幂 p^a 的乘法群是循环群，不存在非平凡的 1 的平方根；但 p | λ(p^a) | k，gcd 直接拆出
+    f = gmpy2.gcd(n, k)
+    if 1 < f < n:
+        return f
+    if f == n:
+        for a in range(2, n.bit_length()):
+            root, exact = gmpy2.iroot(n, a)
+            if exact:
+                return root
+            if root < 3:
+                break
+    r, t = gmpy2.mpz(k), 0
+    while r % 2 == 0:
+        r //= 2
+        t += 1
+    for _ in range(attempts):
+        g = gmpy2.mpz(random.randrange(2, n - 1))
+        f = gmpy2.gcd(g, n)
+        if f > 1:
+            return f
+        y = gmpy2.powmod(g, r, n)
+        for _ in range(t):
+            if y == 1 or y == n - 1:
+                break
+            z = y * y % n
+            if z == 1:
+                return gmpy2.gcd(y - 1, n)
+            y = z
+    return None
+
+
+def factor_with_multiple(n, k, attempts=MAX_ATTEMPTS):
+    """
+    由 λ(n) 的任意倍数 k 完整分解 n（支持多素数），返回升序素因子列表，失败返回 None。
+    k 对 n 的任意因子 m 也是 λ(m) 的倍数，因此对拆出的合数部分继续用同一个 k 递归。
+    """
+    stack, factors = [gmpy2.mpz(n)], []
+    while stack:
+        m = stack.pop()
+        if m == 1:
+            continue
+        if gmpy2.is_prime(m):
+            factors.append(int(m))
+            continue
+        f = _split_with_multiple(m, k, attempts)
+        if f is None:
+            return None
+        stack += [f, m // f]
+    return sorted(factors)
+
+
+def factor_from_d(n, e, d):
+    """由 (n, e, d) 分解 n。"""
+    return factor_with_multiple(n, gmpy2.mpz(e) * d - 1)
+
+
+def factor_from_phi(n, phi):
+    """由 φ(n) 分解 n：先按双素数解 x^2 - (n - φ + 1)·x + n = 0，不成立时再走随机化方法。"""
+    n, phi = gmpy2.mpz(n), gmpy2.mpz(phi)
+    if phi == n - 1 and gmpy2.is_prime(n):
+        return [int(n)]
+    s = n - phi + 1
+    disc = s * s - 4 * n
+    if disc >= 0:
+        root, exact = gmpy2.iroot(disc, 2)
+        if exact and (s - root) % 2 == 0:
+            p, q = (s - root) // 2, (s + root) // 2
+            if p > 1 and p * q == n:
+                return [int(p), int(q)]
+    return factor_with_multiple(n, phi)
+
+
+def factor_from_crt_exponent(n, e, d_part):
+    """由泄露的 dp（或 dq）分解双素数 n，返回 [p, q] 或 None。"""
+    n = gmpy2.mpz(n)
+    exponent = gmpy2.mpz(e) * d_part
+    for w in WITNESSES:
+        p = gmpy2.gcd(gmpy2.powmod(w, exponent, n) - w, n)
+        if 1 < p < n and gmpy2.is_prime(p) and gmpy2.is_prime(n // p):
+            return sorted([int(p), int(n // p)])
+    return None
+
+
+@lru_cache(maxsize=64)
+def _recover_factors(n, e, d, phi, dp, dq):
+    """依次尝试 d、φ、dp、dq；成功时写入分解缓存，之后 factor_n 可直接命中。"""
+    attempts = (
+        ("d", d, lambda: factor_from_d(n, e, d)),
+        ("phi", phi, lambda: factor_from_phi(n, phi)),
+        ("dp", dp, lambda: factor_from_crt_exponent(n, e, dp)),
+        ("dq", dq, lambda: factor_from_crt_exponent(n, e, dq)),
+    )
+    for method, material, recover in attempts:
+        if material is None:
+            continue
+        factors = recover()
+        if factors:
+            remember_factors(n, factors, method)
+            return tuple(factors)
+    return None
+
+
+def recover_private_key(n, e, d=None, phi=None, dp=None, dq=None):
+    """
+    由 d、φ(n)、dp、dq 中的任意一项分解 n，返回可直接 CRT 解密的 RSAPrivateKey，失败返回 None。
+    分解结果按参数缓存，同一组材料重复解密时只分解一次。
+    """
+    to_int = lambda x: None if x is None else int(x)
+    factors = _recover_factors(int(n), int(e), to_int(d), to_int(phi), to_int(dp), to_int(dq))
+    if not factors:
+        return None
+    return load_private_key(factors, e)
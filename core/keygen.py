@@ -1,14 +1,19 @@
 from Crypto.Util.number import bytes_to_long
 import gmpy2
+from math import prod
+from core.rsa_key import phi_from_factors
 
-def gen_keys(p, q, e):
-    n = p * q
-    phi = (p - 1) * (q - 1)
+def gen_keys(p, q, e, extra_primes=()):
+    """extra_primes 为多素数 RSA 的其余素因子；可重复出现以表示素数幂。"""
+    factors = [p, q, *extra_primes]
+    n = prod(factors)
+    phi = phi_from_factors(factors)
     d = gmpy2.invert(e, phi)
     return n, phi, d
 
-def encrypt(p, q, e, message):
-    n = p * q
+def encrypt(p, q, e, message, n=None):
+    if n is None:
+        n = p * q
     m = bytes_to_long(message.encode())
     if m >= n:
         raise ValueError("明文过长，无法加密，请使用更大的 p 和 q。")
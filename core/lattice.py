@@ -0,0 +1,83 @@
+import gmpy2
+
+# ========== LLL 格基约化 ==========
+# Schnorr–Euchner 浮点 LLL：格基本身始终是精确整数，只有 Gram–Schmidt 系数用
+# mpfr 近似（精度与维数同阶即可，不随系数位数增长）。相比全整数版本，
+# Coppersmith 这类系数上万位的格不再需要维护几十万位的行列式中间量。
+
+
+def _exact_dot(u, v):
+    return sum(a * b for a, b in zip(u, v))
+
+
+def lll_reduce(basis, delta=0.99, precision=None):
+    """
+    对线性无关的整数行向量组做 LLL 约化，返回约化后的新基（行向量列表，短向量在前）。
+    precision 为 Gram–Schmidt 计算使用的二进制精度，默认随维数自动选取。
+    """
+    b = [[gmpy2.mpz(x) for x in row] for row in basis]
+    n = len(b)
+    if n <= 1:
+        return b
+    if precision is None:
+        precision = 64 + 4 * n
+
+    with gmpy2.local_context(gmpy2.context(), precision=precision):
+        half_precision = gmpy2.mpfr(2) ** (-(precision // 2))
+        bf = [[gmpy2.mpfr(x) for x in row] for row in b]
+        norms = [_exact_dot(row, row) for row in b]
+        r = [[gmpy2.mpfr(0)] * n for _ in range(n)]
+        mu = [[gmpy2.mpfr(0)] * n for _ in range(n)]
+
+        def dot(k, j):
+            # 浮点内积出现严重抵消时退回精确整数计算
+            s = sum(x * y for x, y in zip(bf[k], bf[j]))
+            if abs(s) < half_precision * gmpy2.sqrt(gmpy2.mpfr(norms[k]) * norms[j]):
+                s = gmpy2.mpfr(_exact_dot(b[k], b[j]))
+            return s
+
+        def gso_row(k):
+            for j in range(k):
+                s = dot(k, j)
+                for i in range(j):
+                    s -= mu[j][i] * r[k][i]
+                r[k][j] = s
+                mu[k][j] = s / r[j][j]
+            s = gmpy2.mpfr(norms[k])
+            for j in range(k):
+                s -= mu[k][j] * r[k][j]
+            r[k][k] = s
+
+        r[0][0] = gmpy2.mpfr(norms[0])
+        k = 1
+        while k < n:
+            # 反复做尺寸约化，直到 |μ_kj| <= 1/2 在当前精度下稳定
+            while True:
+                gso_row(k)
+                reduced = False
+                for j in range(k - 1, -1, -1):
+                    if abs(mu[k][j]) > 0.51:
+                        x = gmpy2.mpz(gmpy2.rint(mu[k][j]))
+                        bk, bj = b[k], b[j]
+                        for i in range(len(bk)):
+                            bk[i] -= x * bj[i]
+                        for i in range(j):
+                            mu[k][i] -= x * mu[j][i]
+                        mu[k][j] -= x
+                        reduced = True
+                if not reduced:
+                    break
+                bf[k] = [gmpy2.mpfr(v) for v in b[k]]
+                norms[k] = _exact_dot(b[k], b[k])
+
+            if delta * r[k - 1][k - 1] > r[k][k] + mu[k][k - 1] ** 2 * r[k - 1][k - 1]:
+                b[k], b[k - 1] = b[k - 1], b[k]
+                bf[k], bf[k - 1] = bf[k - 1], bf[k]
+                norms[k], norms[k - 1] = norms[k - 1], norms[k]
+                k = max(k - 1, 1)
+                if k == 1:
+                    r[0][0] = gmpy2.mpfr(norms[0])
+            else:
+                k += 1
+
+    return b
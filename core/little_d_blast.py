@@ -1,43 +1,120 @@
-from Crypto.Util.number import *
-from sympy import nextprime
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import gmpy2
 
-# 已知明文（从 flag 中 bytes_to_long 计算得到）
-m = 365570067986928236989573788230270407130085464313909252527513197832758480604817399268366313889131551088558394832418649150417321940578277210433329648095352247884911033780856767602238960538520312352025465812228462858158997175162265505345470937926646520732298730237509998898024691120409770049168658027104966429925920045510148612448817
+# ========== 小 d 爆破（并行、可断点续跑） ==========
+# 逐个枚举 d 时不再对每个 d 做完整模幂：维护 cur = base^d，每步只乘一次 base^2
+# （d 必为奇数，因为 φ(n) 为偶数且 e·d ≡ 1）。
+#   已知 (m, c)：base = c，目标 cur == m
+#   只知 (n, e, c)：取见证 w，base = w^e，目标 cur == w（即 w^(e·d) ≡ w），命中后再用第二个见证确认
+# 区间按 CHUNK_SIZE 切块分给进程池，完成的块记录到检查点文件，中断后重新运行会跳过这些块。
 
-print("🔍 正在尝试爆破 d（1~100）...")
+CHUNK_SIZE = 1 << 20
+WITNESSES = (2, 3)
 
-# 枚举 d
-for d in range(1, 100):
-    print(f"尝试 d = {d}")
-    # 枚举 p（4096 位是猜测，也可以从 m 开始估计）
-    p = nextprime(2 ** 2047)
 
-    for _ in range(1000):  # 尝试 1000 对 (p, q)
-        q = nextprime(p + 2 ** 16)
-        n = p * q
-        phi = (p - 1) * (q - 1)
+def search_d_range(n, base, target, d_start, d_end):
+    """在 [d_start, d_end) 的奇数中寻找 base^d ≡ target (mod n) 的 d，返回 d 或 None。"""
+    n = gmpy2.mpz(n)
+    d = d_start | 1
+    if d >= d_end:
+        return None
+    step = gmpy2.powmod(base, 2, n)
+    cur = gmpy2.powmod(base, d, n)
+    target = gmpy2.mpz(target) % n
+    while d < d_end:
+        if cur == target:
+            return d
+        cur = cur * step % n
+        d += 2
+    return None
 
+
+def _load_checkpoint(path, key):
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "r") as f:
+        state = json.load(f)
+    if state.get("key") != key:
+        print("⚠️ 检查点文件与当前参数不符，忽略并重新开始。")
+        return set()
+    return set(state["done"])
+
+
+def _save_checkpoint(path, key, done):
+    if not path:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"key": key, "done": sorted(done)}, f)
+    os.replace(tmp, path)
+
+
+def search_small_d(n, e=None, c=None, m=None, d_start=1, d_end=1 << 24,
+                   workers=None, checkpoint=None, chunk_size=CHUNK_SIZE):
+    """
+    在 [d_start, d_end) 中搜索私钥 d。提供 (m, c) 时直接比较 c^d 与 m；
+    否则需要 e，用见证 w^(e·d) ≡ w 判断。checkpoint 为检查点文件路径（可选）。
+    返回 d 或 None。
+    """
+    n = int(n)
+    if m is not None and c is not None:
+        base, target = int(c), int(m)
+        verify = lambda d: True
+    elif e is not None:
+        w = WITNESSES[0]
+        base, target = int(gmpy2.powmod(w, e, n)), w
+        verify = lambda d: all(gmpy2.powmod(v, e * d, n) == v % n for v in WITNESSES[1:])
+    else:
+        raise ValueError("需要提供 (m, c) 或 e")
+
+    key = f"{n}:{base}:{target}:{chunk_size}"
+    done = _load_checkpoint(checkpoint, key)
+    chunks = [(lo, min(lo + chunk_size, d_end)) for lo in range(d_start, d_end, chunk_size)
+              if lo not in done]
+    if done:
+        print(f"⏩ 从检查点恢复，跳过已完成的 {len(done)} 个区间块。")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(search_d_range, n, base, target, lo, hi): lo for lo, hi in chunks}
         try:
-            e = inverse(d, phi)
-        except:
-            p = nextprime(p)
-            continue
-
-        c = pow(m, e, n)
-        m_test = pow(c, d, n)
-
-        if m_test == m:
-            print("🎯 找到了正确的参数！")
-            print(f"p = {p}")
-            print(f"q = {q}")
-            print(f"n = {n}")
-            print(f"d = {d}")
-            print(f"e = {e}")
-            print(f"c = {c}")
-            print("flag:", long_to_bytes(m))
-            exit(0)
-
-        p = nextprime(p)
-
-print("❌ 未找到合适参数，请扩大搜索空间")
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    lo = pending.pop(future)
+                    d = future.result()
+                    if d and verify(d):
+                        return d
+                    done.add(lo)
+                _save_checkpoint(checkpoint, key, done)
+                print(f"⏳ 已完成 {len(done)} 个区间块，剩余 {len(pending)} 个")
+        finally:
+            for future in pending:
+                future.cancel()
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel, resumable brute-force search for a small RSA private exponent")
+    parser.add_argument("-n", required=True, type=lambda x: int(x, 0))
+    parser.add_argument("-e", type=lambda x: int(x, 0))
+    parser.add_argument("-c", type=lambda x: int(x, 0))
+    parser.add_argument("-m", type=lambda x: int(x, 0), help="Known plaintext matching c")
+    parser.add_argument("--start", type=int, default=1)
+    parser.add_argument("--end", type=int, default=1 << 24)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file for resuming")
+    args = parser.parse_args()
+
+    print(f"🔍 正在爆破 d ∈ [{args.start}, {args.end}) ...")
+    d = search_small_d(args.n, args.e, args.c, args.m, args.start, args.end, args.workers, args.checkpoint)
+    if d:
+        print(f"🎯 找到 d = {d}")
+        if args.c is not None:
+            print(f"m = {pow(args.c, d, args.n)}")
+    else:
+        print("❌ 未找到 d，请扩大搜索范围")
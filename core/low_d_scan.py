@@ -0,0 +1,107 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+import gmpy2
+from core.boneh_durfee import boneh_durfee_attack
+from core.wiener import wiener_attack
+
+# ========== 公钥库批量低解密指数扫描 ==========
+# 对整份 (n, e) 列表并行跑 Wiener（可选 Boneh–Durfee），结果逐条写入 JSONL。
+# 支持的输入格式（可混用）：每行 "n e" / "n,e"、JSON 对象 {"n": ..., "e": ...}，
+# 以及 key_to_n-e.py 的输出（"e (decimal): ..." 与 "n (decimal): ..." 成对出现）。
+
+PROGRESS_INTERVAL = 1000
+_DECIMAL_LINE = re.compile(r"^([ne]) \(decimal\):\s*(\d+)")
+_HEX_LINE = re.compile(r"^[ne] \(hex\):")
+
+
+def read_key_corpus(path):
+    """逐个产出 (n, e)，不把整个文件读入内存。"""
+    pending = {}
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if _HEX_LINE.match(line):
+                continue
+            match = _DECIMAL_LINE.match(line)
+            if match:
+                pending[match.group(1)] = int(match.group(2))
+                if len(pending) == 2:
+                    yield pending["n"], pending["e"]
+                    pending = {}
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                yield int(str(item["n"]), 0), int(str(item["e"]), 0)
+                continue
+            n, e = re.split(r"[\s,]+", line)[:2]
+            yield int(n, 0), int(e, 0)
+
+
+def check_key(args):
+    """子进程任务：对单个公钥跑低 d 检测，返回可直接写入 JSONL 的字典。"""
+    index, n, e, use_boneh_durfee = args
+    result = {"index": index, "n": str(n), "e": str(e), "vulnerable": False}
+    d, method = wiener_attack(e, n), "Wiener"
+    if not d and use_boneh_durfee:
+        d, method = boneh_durfee_attack(e, n), "Boneh-Durfee"
+    if d:
+        # 已知 d 后由 k·φ = e·d - 1 解出 p + q，顺带给出分解结果
+        result.update(vulnerable=True, method=method, d=str(d))
+        guess = (e * d - 1) // n + 1
+        for k in (guess, guess - 1, guess + 1):
+            if k <= 0 or (e * d - 1) % k:
+                continue
+            s = n - (e * d - 1) // k + 1
+            discrim = s * s - 4 * n
+            if discrim >= 0 and gmpy2.is_square(discrim):
+                root = gmpy2.isqrt(discrim)
+                result.update(p=str((s - root) // 2), q=str((s + root) // 2))
+                break
+    return result
+
+
+def scan_corpus(path, out_path, workers=None, boneh_durfee=False, chunksize=32):
+    """
+    用进程池扫描 path 中的全部公钥，每条结果立即追加写入 out_path（JSONL）。
+    返回汇总 {"total", "vulnerable", "elapsed", "keys_per_second"}。
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = ((i, n, e, boneh_durfee) for i, (n, e) in enumerate(read_key_corpus(path)))
+    total = vulnerable = 0
+    start = time.time()
+
+    with multiprocessing.Pool(workers) as pool, open(out_path, "w") as out:
+        for result in pool.imap_unordered(check_key, tasks, chunksize=chunksize):
+            out.write(json.dumps(result) + "\n")
+            total += 1
+            if result["vulnerable"]:
+                vulnerable += 1
+                out.flush()
+                print(f"✅ 第 {result['index']} 个公钥存在低 d 漏洞（{result['method']}）: d = {result['d']}")
+            if total % PROGRESS_INTERVAL == 0:
+                elapsed = time.time() - start
+                print(f"⏳ 已扫描 {total} 个公钥，{total / elapsed:.1f} keys/s")
+
+    elapsed = time.time() - start
+    summary = {"total": total, "vulnerable": vulnerable, "elapsed": elapsed,
+               "keys_per_second": total / elapsed if elapsed else 0.0}
+    print(f"📊 扫描完成：{total} 个公钥，{vulnerable} 个存在漏洞，"
+          f"耗时 {elapsed:.1f}s（{summary['keys_per_second']:.1f} keys/s）")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan a corpus of RSA public keys for small private exponents")
+    parser.add_argument("-f", "--file", required=True, help="Key list: 'n e' per line, JSON lines, or key_to_n-e.py output")
+    parser.add_argument("-o", "--output", default="low_d_results.jsonl", help="JSONL output path")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--boneh-durfee", action="store_true", help="Also run Boneh-Durfee when Wiener fails (slow)")
+    args = parser.parse_args()
+
+    scan_corpus(args.file, args.output, args.workers, args.boneh_durfee)
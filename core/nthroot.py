@@ -0,0 +1,225 @@
+import heapq
+import random
+from collections import Counter
+from itertools import islice, product
+import gmpy2
+from Crypto.Util.number import long_to_bytes
+
+# ========== 模素数开 e 次方根（gcd(e, φ) ≠ 1 时的解密） ==========
+# e | p-1 时 x ↦ x^e 不再是双射，私钥 d 不存在：改为在每个素数（幂）下求出 c 的全部 e 次方根，
+# 再经 CRT 组合。候选明文个数是各分量根数之积，可能极大，因此只惰性生成并按可读性打分取前几名。
+
+
+def _factorize_small(e):
+    """分解 e（通常很小），返回 {素数: 次数}。"""
+    factors = Counter()
+    d = 2
+    while d * d <= e:
+        while e % d == 0:
+            factors[d] += 1
+            e //= d
+        d += 1
+    if e > 1:
+        factors[e] += 1
+    return factors
+
+
+def _non_residue(r, p):
+    """随机找一个模 p 的非 r 次剩余。"""
+    exponent = (p - 1) // r
+    while True:
+        z = random.randrange(2, p)
+        if gmpy2.powmod(z, exponent, p) != 1:
+            return gmpy2.mpz(z)
+
+
+def tonelli_shanks(a, p):
+    """模奇素数 p 的平方根（a 须为二次剩余），返回其中一个根。"""
+    a = gmpy2.mpz(a) % p
+    if a == 0:
+        return gmpy2.mpz(0)
+    if p % 4 == 3:
+        return gmpy2.powmod(a, (p + 1) // 4, p)
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = _non_residue(2, p)
+    m, c = s, gmpy2.powmod(z, q, p)
+    t, r = gmpy2.powmod(a, q, p), gmpy2.powmod(a, (q + 1) // 2, p)
+    while t != 1:
+        i, t2 = 0, t
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = gmpy2.powmod(c, 1 << (m - i - 1), p)
+        m, c = i, b * b % p
+        t, r = t * c % p, r * b % p
+    return r
+
+
+def _discrete_log(base, target, order, p):
+    """在 base 生成的 order 阶子群中求 base^j = target（小步大步）。"""
+    step = gmpy2.isqrt(order) + 1
+    table = {}
+    cur = gmpy2.mpz(1)
+    for j in range(step):
+        table.setdefault(cur, j)
+        cur = cur * base % p
+    giant = gmpy2.powmod(base, -step, p)
+    cur = gmpy2.mpz(target)
+    for i in range(step):
+        if cur in table:
+            return (i * step + table[cur]) % order
+        cur = cur * giant % p
+    raise ValueError("离散对数不存在")
+
+
+def amm_root(a, r, p):
+    """
+    Adleman–Manders–Miller：r 为素数且 r | p-1 时求 a 的一个 r 次方根（a 须为 r 次剩余）。
+    r = 2 时退化为 Tonelli–Shanks。
+    """
+    if r == 2:
+        return tonelli_shanks(a, p)
+    a = gmpy2.mpz(a) % p
+    if a == 0:
+        return gmpy2.mpz(0)
+    t, s = 0, p - 1
+    while s % r == 0:
+        s //= r
+        t += 1
+    rho = _non_residue(r, p)
+    alpha = gmpy2.invert(r, s) if s > 1 else 0
+    unity = gmpy2.powmod(rho, r ** (t - 1) * s, p)         # r 次单位根（阶为 r）
+    b = gmpy2.powmod(a, r * alpha - 1, p)
+    c = gmpy2.powmod(rho, s, p)
+    h = gmpy2.mpz(1)
+    for i in range(1, t):
+        d = gmpy2.powmod(b, r ** (t - 1 - i), p)
+        j = 0 if d == 1 else (-_discrete_log(unity, d, r, p)) % r
+        b = b * gmpy2.powmod(c, r * j, p) % p
+        h = h * gmpy2.powmod(c, j, p) % p
+        c = gmpy2.powmod(c, r, p)
+    return gmpy2.powmod(a, alpha, p) * h % p
+
+
+def _unity_roots(r, p):
+    """模 p 的全部 r 次单位根（r | p-1）。"""
+    zeta = gmpy2.powmod(_non_residue(r, p), (p - 1) // r, p)
+    roots, cur = [], gmpy2.mpz(1)
+    for _ in range(r):
+        roots.append(cur)
+        cur = cur * zeta % p
+    return roots
+
+
+def nth_roots_mod_prime(c, e, p):
+    """返回 x^e ≡ c (mod p) 的全部解（升序列表，无解时为空）。"""
+    p = gmpy2.mpz(p)
+    c = gmpy2.mpz(c) % p
+    if c == 0:
+        return [0]
+    # e 中与 p-1 互素的部分对应双射，直接用逆指数一次开出
+    coprime, parts = 1, []
+    for r, k in _factorize_small(e).items():
+        if (p - 1) % r:
+            coprime *= r ** k
+        else:
+            parts.extend([r] * k)
+    roots = {gmpy2.powmod(c, gmpy2.invert(coprime, p - 1), p)}
+    # 其余素因子逐个开 r 次方根，每一步把所有根乘上 r 次单位根展开
+    for r in parts:
+        exponent = (p - 1) // r
+        unity = _unity_roots(r, p)
+        next_roots = set()
+        for y in roots:
+            if gmpy2.powmod(y, exponent, p) != 1:
+                continue
+            x = amm_root(y, r, p)
+            next_roots.update(x * z % p for z in unity)
+        roots = next_roots
+    return sorted(int(x) for x in roots)
+
+
+def nth_roots_mod_prime_power(c, e, p, k):
+    """模 p^k 的 e 次方根：先模 p 求根，再 Hensel 提升（要求 p ∤ e 且根不被 p 整除）。"""
+    roots = nth_roots_mod_prime(c, e, p)
+    if k == 1:
+        return roots
+    if e % p == 0:
+        raise ValueError("p | e 时无法 Hensel 提升")
+    p = gmpy2.mpz(p)
+    modulus = p ** k
+    lifted = []
+    for x in roots:
+        if x % p == 0:
+            continue
+        x, mod = gmpy2.mpz(x), p
+        while mod < modulus:
+            mod = min(mod * mod, modulus)
+            fx = gmpy2.powmod(x, e, mod) - c
+            dfx = e * gmpy2.powmod(x, e - 1, mod)
+            x = (x - fx * gmpy2.invert(dfx, mod)) % mod
+        lifted.append(int(x))
+    return sorted(lifted)
+
+
+def crt_candidates(root_lists, moduli):
+    """惰性枚举各分量根的所有 CRT 组合，不构造整个笛卡尔积。"""
+    N = gmpy2.mpz(1)
+    for r in moduli:
+        N *= r
+    basis = []
+    for r in moduli:
+        Mi = N // r
+        basis.append(Mi * gmpy2.invert(Mi, r) % N)
+    for combo in product(*root_lists):
+        yield int(sum(x * b for x, b in zip(combo, basis)) % N)
+
+
+def plaintext_score(m):
+    """可读性打分：明文字节中可打印 ASCII 的比例（0~1）。"""
+    data = long_to_bytes(m)
+    if not data:
+        return 0.0
+    printable = sum(32 <= ch < 127 or ch in (9, 10, 13) for ch in data)
+    return printable / len(data)
+
+
+def rank_plaintexts(candidates, top=5, limit=None):
+    """
+    边生成边打分，只保留得分最高的 top 个（堆，O(top) 内存）。
+    遇到完全可打印的候选立即返回，不必遍历剩余组合。
+    """
+    heap = []
+    for i, m in enumerate(islice(candidates, limit)):
+        score = plaintext_score(m)
+        if score == 1.0:
+            return [m] + [x for _, _, x in sorted(heap, reverse=True)][:top - 1]
+        item = (score, i, m)
+        if len(heap) < top:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [m for _, _, m in sorted(heap, reverse=True)]
+
+
+def decrypt_non_coprime(factors, e, c, top=5, limit=None):
+    """
+    gcd(e, φ(n)) ≠ 1 时的解密：各素数幂分量开 e 次方根后 CRT 组合，返回按可读性排序的候选明文。
+    factors 为素因子列表（含重数）；limit 可限制最多检查的组合数。
+    """
+    counts = sorted(Counter(int(f) for f in factors).items())
+    moduli, root_lists = [], []
+    for p, k in counts:
+        roots = nth_roots_mod_prime_power(c, e, p, k)
+        if not roots:
+            return []
+        moduli.append(p ** k)
+        root_lists.append(roots)
+    total = 1
+    for roots in root_lists:
+        total *= len(roots)
+    print(f"🧮 各分量根数: {' × '.join(str(len(r)) for r in root_lists)}，共 {total} 个候选明文")
+    return rank_plaintexts(crt_candidates(root_lists, moduli), top, limit)
@@ -0,0 +1,193 @@
+import time
+import gmpy2
+from core.primes import primes_up_to, iter_primes
+
+# ========== Pollard rho（Brent 变体） ==========
+
+def pollard_rho_brent(n, max_iterations=1 << 21, batch=128, polynomials=(1, 3, 5, 7, 11, 13), timeout=None):
+    """
+    Brent 改进的 Pollard rho：每 batch 次迭代把 |x - y| 累乘后才做一次 gcd，
+    某个多项式 f(x) = x^2 + c 退化（gcd = n）时换下一个 c。
+    max_iterations 为所有多项式共享的迭代预算：期望 O(sqrt(p)) 步，2^21 步足以覆盖 40 位左右的因子；
+    timeout 为秒数上限，每次 gcd 前检查。
+    """
+    n = gmpy2.mpz(n)
+    if n % 2 == 0 and n > 2:
+        return 2, int(n // 2)
+    if n < 4 or gmpy2.is_prime(n):
+        return None
+
+    budget = max_iterations
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for c in polynomials:
+        y, r, q, g = gmpy2.mpz(2), 1, gmpy2.mpz(1), gmpy2.mpz(1)
+        x = ys = y
+        while g == 1 and budget > 0:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            budget -= r
+            k = 0
+            while k < r and g == 1 and budget > 0:
+                ys = y
+                steps = min(batch, r - k)
+                for _ in range(steps):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gmpy2.gcd(q, n)
+                k += steps
+                budget -= steps
+                if deadline is not None and time.monotonic() > deadline:
+                    budget = 0
+            r *= 2
+
+        if g == n:
+            # 累乘把多个因子一并吞掉了，从上一个检查点逐步回退
+            g = gmpy2.mpz(1)
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gmpy2.gcd(abs(x - ys), n)
+
+        if 1 < g < n:
+            return int(g), int(n // g)
+        if budget <= 0:
+            break
+    return None
+
+
+# ========== Pollard p-1 / Williams p+1 ==========
+
+def _prime_power_blocks(B1, block_size=256):
+    """把 B1 以内每个素数 p 的最大幂 p^k <= B1 按块相乘，供第一阶段分段取幂。"""
+    primes = primes_up_to(B1 + 1)
+    for i in range(0, len(primes), block_size):
+        powers = []
+        for p in primes[i:i + block_size]:
+            pk = p
+            while pk * p <= B1:
+                pk *= p
+            powers.append(pk)
+        yield powers
+
+
+def _stage1(x, n, B1, power, offset, deadline=None):
+    """
+    第一阶段：x <- power(x, E)，E 为 B1 光滑数的最小公倍数，按块检查 gcd(x - offset, n)。
+    若一块内同时命中所有因子（gcd = n），则逐个素数幂重做该块。
+    返回 (因子或 None, 第一阶段结束时的 x)；超过 deadline 时返回 (None, None)。
+    """
+    for powers in _prime_power_blocks(B1):
+        if deadline is not None and time.monotonic() > deadline:
+            return None, None
+        saved = x
+        exponent = gmpy2.mpz(1)
+        for pk in powers:
+            exponent *= pk
+        x = power(x, exponent)
+        g = gmpy2.gcd(x - offset, n)
+        if g == 1:
+            continue
+        if g == n:
+            x = saved
+            for pk in powers:
+                x = power(x, pk)
+                g = gmpy2.gcd(x - offset, n)
+                if g != 1:
+                    break
+        if 1 < g < n:
+            return g, x
+        return None, x
+    return None, x
+
+
+def _lucas_stage2(v, n, B1, B2, D=2310, gcd_interval=2048, deadline=None):
+    """
+    大步小步第二阶段（p-1 与 p+1 共用）。v = α + α^{-1}，对 (B1, B2] 中每个素数
+    q = kD ± j，累乘 V_{kD} - V_j；q 的阶整除 kD ± j 时该项含有因子 p。
+    kD - j 与 kD + j 同为素数时共用一次乘法（素数配对）。
+    """
+    # 小步：V_j，j 与 D 互素，j <= D/2
+    baby = {}
+    v_prev, v_cur = gmpy2.mpz(2), v
+    for j in range(1, D // 2 + 1):
+        if gmpy2.gcd(j, D) == 1:
+            baby[j] = v_cur
+        v_prev, v_cur = v_cur, (v_cur * v - v_prev) % n
+
+    # 大步：V_{kD}，用 V_{(k+1)D} = V_{kD} V_D - V_{(k-1)D} 递推
+    v_d = gmpy2.lucasv_mod(v, 1, D, n)
+    k = (B1 + D // 2) // D
+    giant = gmpy2.lucasv_mod(v_d, 1, k, n)
+    giant_prev = gmpy2.lucasv_mod(v_d, 1, k - 1, n) if k > 0 else v_d
+
+    acc = gmpy2.mpz(1)
+    last_pair = None
+    count = 0
+    for q in iter_primes(B2 + 1, start=B1 + 1):
+        qk = (q + D // 2) // D
+        while k < qk:
+            giant, giant_prev = (giant * v_d - giant_prev) % n, giant
+            k += 1
+        j = abs(q - k * D)
+        if (k, j) == last_pair or j not in baby:
+            continue
+        last_pair = (k, j)
+        acc = acc * (giant - baby[j]) % n
+        count += 1
+        if count % gcd_interval == 0:
+            g = gmpy2.gcd(acc, n)
+            if g != 1:
+                return g if g < n else None
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+    g = gmpy2.gcd(acc, n)
+    return g if 1 < g < n else None
+
+
+def pollard_pm1(n, B1=100000, B2=10000000, base=2, timeout=None):
+    """
+    Pollard p-1：适用于 p-1 为 (B1, B2) 光滑的情况，即 p-1 除一个不超过 B2 的素因子外全部不超过 B1。
+    timeout 为两个阶段合计的秒数上限。
+    """
+    n = gmpy2.mpz(n)
+    if n % 2 == 0:
+        return (2, int(n // 2)) if n > 2 else None
+    if n < 4 or gmpy2.is_prime(n):
+        return None
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    g, a = _stage1(gmpy2.mpz(base), n, B1, lambda x, e: gmpy2.powmod(x, e, n), 1, deadline)
+    if g is None and a is not None and B2 > B1:
+        try:
+            v = (a + gmpy2.invert(a, n)) % n
+        except ZeroDivisionError:
+            g = gmpy2.gcd(a, n)
+        else:
+            g = _lucas_stage2(v, n, B1, B2, deadline=deadline)
+    if g and 1 < g < n:
+        return int(g), int(n // g)
+    return None
+
+
+def williams_pp1(n, B1=100000, B2=10000000, seeds=(3, 4, 6), timeout=None):
+    """
+    Williams p+1：基于 Lucas 序列 V_k(A)，当 A^2 - 4 是模 p 的二次非剩余且 p+1 光滑时成功；
+    由于无法预知二次特征，依次尝试多个种子 A（默认种子的 A^2 - 4 分别为 5、12、32，二次特征互相独立）。
+    timeout 为所有种子合计的秒数上限。
+    """
+    n = gmpy2.mpz(n)
+    if n % 2 == 0:
+        return (2, int(n // 2)) if n > 2 else None
+    if n < 4 or gmpy2.is_prime(n):
+        return None
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for seed in seeds:
+        g, v = _stage1(gmpy2.mpz(seed), n, B1, lambda x, e: gmpy2.lucasv_mod(x, 1, e, n), 2, deadline)
+        if v is None:
+            return None
+        if g is None and B2 > B1:
+            g = _lucas_stage2(v, n, B1, B2, deadline=deadline)
+        if g and 1 < g < n:
+            return int(g), int(n // g)
+    return None
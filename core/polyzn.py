@@ -0,0 +1,207 @@
+import gmpy2
+
+# ========== Z_n[x] 上的多项式运算 ==========
+# 多项式用系数列表表示（低次在前，末项非零，零多项式为 []），系数取 [0, n) 中的整数；
+# n 传入 mpz 时全部运算走 GMP，比 Python int 的模乘快数倍，入口函数会自动转换。
+# 乘法用 Kronecker 代换：把系数按固定位宽打包成一个大整数，交给 GMP 的大整数乘法
+# （大尺寸时走 FFT），再拆回系数；GCD 用 half-GCD，复杂度 O(M(d)·log d)，
+# 使 e = 65537 这类高次多项式的 GCD 可行。
+
+NAIVE_MUL_LIMIT = 16       # 两个多项式都不超过该长度时用朴素乘法
+NAIVE_DIV_LIMIT = 64       # 商的次数不超过该值时用朴素长除法
+NAIVE_GCD_LIMIT = 64       # 次数低于该值时 half-GCD 退化为逐步辗转相除
+
+
+def trim(f):
+    while f and f[-1] == 0:
+        f.pop()
+    return f
+
+
+def degree(f):
+    return len(f) - 1
+
+
+def poly_add(f, g, n):
+    if len(f) < len(g):
+        f, g = g, f
+    return trim([(a + (g[i] if i < len(g) else 0)) % n for i, a in enumerate(f)])
+
+
+def poly_sub(f, g, n):
+    size = max(len(f), len(g))
+    return trim([((f[i] if i < len(f) else 0) - (g[i] if i < len(g) else 0)) % n
+                 for i in range(size)])
+
+
+def poly_scale(f, k, n):
+    return trim([a * k % n for a in f])
+
+
+def poly_mul(f, g, n):
+    if not f or not g:
+        return []
+    if min(len(f), len(g)) <= NAIVE_MUL_LIMIT:
+        result = [0] * (len(f) + len(g) - 1)
+        for i, a in enumerate(f):
+            if a:
+                for j, b in enumerate(g):
+                    result[i + j] += a * b
+        return trim([x % n for x in result])
+
+    # Kronecker 代换：每个系数占 width 字节，足以容纳乘积累加和而不进位到下一格
+    bits = 2 * int(n).bit_length() + min(len(f), len(g)).bit_length() + 1
+    width = (bits + 7) // 8
+
+    def pack(h):
+        return gmpy2.mpz.from_bytes(b"".join(a.to_bytes(width, "little") for a in h), "little")
+
+    size = len(f) + len(g) - 1
+    data = (pack(f) * pack(g)).to_bytes(size * width, "little")
+    unpack = gmpy2.mpz.from_bytes
+    return trim([unpack(data[i * width:(i + 1) * width], "little") % n for i in range(size)])
+
+
+def _inverse_series(f, k, n):
+    """f 在 mod x^k 下的乘法逆（Newton 迭代，要求 f[0] 模 n 可逆）。"""
+    g = [gmpy2.invert(f[0], n)]
+    precision = 1
+    while precision < k:
+        precision = min(2 * precision, k)
+        fg = poly_mul(f[:precision], g, n)[:precision]
+        correction = poly_sub([2], fg, n)
+        g = poly_mul(g, correction, n)[:precision]
+    return g
+
+
+def poly_divmod(f, g, n):
+    """带余除法 f = q·g + r，要求 g 的首项系数模 n 可逆。"""
+    if not g:
+        raise ZeroDivisionError("多项式除以零")
+    if len(f) < len(g):
+        return [], list(f)
+    k = len(f) - len(g)
+    lead_inv = gmpy2.invert(g[-1], n)
+    if k <= NAIVE_DIV_LIMIT:
+        r = list(f)
+        q = [0] * (k + 1)
+        dg = len(g) - 1
+        for i in range(k, -1, -1):
+            coef = r[i + dg] * lead_inv % n
+            q[i] = coef
+            if coef:
+                for j, b in enumerate(g):
+                    r[i + j] = (r[i + j] - coef * b) % n
+        return trim(q), trim(r[:dg])
+    # 反转多项式后用 Newton 求逆计算商：rev(q) = rev(f)·rev(g)^{-1} mod x^{k+1}
+    rev_q = poly_mul(f[::-1][:k + 1], _inverse_series(g[::-1], k + 1, n), n)[:k + 1]
+    q = trim((rev_q + [0] * (k + 1 - len(rev_q)))[::-1])
+    return q, poly_sub(f, poly_mul(q, g, n), n)
+
+
+def poly_monic(f, n):
+    return poly_scale(f, gmpy2.invert(f[-1], n), n)
+
+
+# ---------- half-GCD ----------
+# 2×2 多项式矩阵以 (m00, m01, m10, m11) 表示；作用在列向量 (a, b) 上。
+
+_IDENTITY = ([1], [], [], [1])
+
+
+def _apply(M, a, b, n):
+    m00, m01, m10, m11 = M
+    return (poly_add(poly_mul(m00, a, n), poly_mul(m01, b, n), n),
+            poly_add(poly_mul(m10, a, n), poly_mul(m11, b, n), n))
+
+
+def _step_matrix(q, M, n):
+    """[[0, 1], [1, -q]] · M"""
+    m00, m01, m10, m11 = M
+    return (m10, m11, poly_sub(m00, poly_mul(q, m10, n), n), poly_sub(m01, poly_mul(q, m11, n), n))
+
+
+def _mat_mul(A, B, n):
+    a00, a01, a10, a11 = A
+    b00, b01, b10, b11 = B
+    return (poly_add(poly_mul(a00, b00, n), poly_mul(a01, b10, n), n),
+            poly_add(poly_mul(a00, b01, n), poly_mul(a01, b11, n), n),
+            poly_add(poly_mul(a10, b00, n), poly_mul(a11, b10, n), n),
+            poly_add(poly_mul(a10, b01, n), poly_mul(a11, b11, n), n))
+
+
+def half_gcd(a, b, n):
+    """
+    deg a > deg b 时返回矩阵 M，使 M·(a, b) = (c, d) 为辗转相除序列中相邻的两项，
+    且 deg c >= m > deg d，其中 m = ⌈deg a / 2⌉。
+    """
+    m = (degree(a) + 1) // 2
+    if degree(b) < m:
+        return _IDENTITY
+    if degree(a) < NAIVE_GCD_LIMIT:
+        M = _IDENTITY
+        while b and degree(b) >= m:
+            q, r = poly_divmod(a, b, n)
+            M = _step_matrix(q, M, n)
+            a, b = b, r
+        return M
+
+    R = half_gcd(a[m:], b[m:], n)
+    c, d = _apply(R, a, b, n)
+    if degree(d) < m:
+        return R
+    q, r = poly_divmod(c, d, n)
+    R = _step_matrix(q, R, n)
+    k = max(2 * m - degree(d), 0)
+    S = half_gcd(d[k:], r[k:], n)
+    return _mat_mul(S, R, n)
+
+
+def _half_reduce(a, b, n):
+    """
+    与 half_gcd 相同的两段递归，但直接返回约化后的 (c, d) 而不是变换矩阵：
+    顶层不需要矩阵，省去最后一次矩阵乘法以及把矩阵重新作用到整对多项式上的开销。
+    """
+    m = (degree(a) + 1) // 2
+    if degree(b) < m:
+        return a, b
+    c, d = _apply(half_gcd(a[m:], b[m:], n), a, b, n)
+    if degree(d) < m:
+        return c, d
+    q, r = poly_divmod(c, d, n)
+    k = max(2 * m - degree(d), 0)
+    return _apply(half_gcd(d[k:], r[k:], n), d, r, n)
+
+
+def poly_gcd(a, b, n):
+    """Z_n[x] 上的首一 GCD；遇到不可逆的首项系数时抛出 ZeroDivisionError（此时可顺带分解 n）。"""
+    n = gmpy2.mpz(n)
+    a = trim([gmpy2.mpz(x) % n for x in a])
+    b = trim([gmpy2.mpz(x) % n for x in b])
+    if len(a) < len(b):
+        a, b = b, a
+    while b:
+        if degree(a) == degree(b):
+            a, b = b, poly_divmod(a, b, n)[1]
+            continue
+        a, b = _half_reduce(a, b, n)
+        if not b:
+            break
+        a, b = b, poly_divmod(a, b, n)[1]
+    return poly_monic(a, n) if a else []
+
+
+def linear_power(a, b, e, n):
+    """(a·x + b)^e 的展开，按二项式定理逐项递推，O(e) 次模乘。"""
+    n = gmpy2.mpz(n)
+    a, b = gmpy2.mpz(a) % n, gmpy2.mpz(b) % n
+    coeffs = [0] * (e + 1)
+    b_powers = [gmpy2.mpz(1)] * (e + 1)
+    for k in range(1, e + 1):
+        b_powers[k] = b_powers[k - 1] * b % n
+    binom, a_power = gmpy2.mpz(1), gmpy2.mpz(1)
+    for k in range(e + 1):
+        coeffs[k] = binom * a_power % n * b_powers[e - k] % n
+        binom = binom * (e - k) % n * gmpy2.invert(k + 1, n) % n
+        a_power = a_power * a % n
+    return trim(coeffs)
@@ -0,0 +1,69 @@
+from array import array
+from functools import lru_cache
+from itertools import compress
+from math import isqrt
+from core.batch_gcd import product_tree
+
+# ========== 小素数表（各分解阶段共享） ==========
+
+SEGMENT_SIZE = 1 << 20
+
+
+@lru_cache(maxsize=8)
+def primes_up_to(limit):
+    """
+    埃氏筛，返回 [2, limit) 内全部素数组成的元组，结果按 limit 缓存。
+    """
+    if limit < 3:
+        return ()
+    sieve = bytearray([1]) * limit
+    sieve[0] = sieve[1] = 0
+    for i in range(2, isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return tuple(compress(range(limit), sieve))
+
+
+def iter_primes(limit, start=2):
+    """
+    分段筛，按升序逐个产出 [start, limit) 内的素数，内存占用与 limit 无关。
+    """
+    if limit <= SEGMENT_SIZE:
+        for p in primes_up_to(limit):
+            if p >= start:
+                yield p
+        return
+
+    base = primes_up_to(isqrt(limit - 1) + 1)
+    lo = max(start, 2)
+    while lo < limit:
+        hi = min(lo + SEGMENT_SIZE, limit)
+        segment = bytearray([1]) * (hi - lo)
+        for p in base:
+            if p * p >= hi:
+                break
+            first = max(p * p, (lo + p - 1) // p * p)
+            segment[first - lo::p] = bytes(len(range(first, hi, p)))
+        for i in compress(range(lo, hi), segment):
+            if i >= 2:
+                yield i
+        lo = hi
+
+
+@lru_cache(maxsize=4)
+def prime_blocks(limit, block_size=2048):
+    """
+    将 [2, limit) 内的素数按 block_size 分块，返回 ((primes, product), ...)。
+    每块的素数乘积只计算一次，供试除阶段反复求 gcd。
+    """
+    blocks = []
+    primes = array('L')
+    for p in iter_primes(limit):
+        primes.append(p)
+        if len(primes) == block_size:
+            blocks.append((primes, product_tree(primes)[-1][0]))
+            primes = array('L')
+    if primes:
+        blocks.append((primes, product_tree(primes)[-1][0]))
+    return tuple(blocks)
+
@@ -0,0 +1,74 @@
+from collections import Counter
+from functools import lru_cache
+import gmpy2
+
+# ========== CRT 私钥上下文 ==========
+
+def phi_from_factors(factors):
+    """由素因子列表（含重数）计算 φ(n)：φ(p^k) = p^(k-1)·(p-1)。"""
+    phi = 1
+    for p, k in Counter(int(f) for f in factors).items():
+        phi *= p ** (k - 1) * (p - 1)
+    return phi
+
+
+class RSAPrivateKey:
+    """
+    预先计算 d 以及各素数幂分量上的指数和 Garner 系数的私钥，解密走 CRT：
+    把一次全长模幂拆成若干次短模幂，双素数约快 3~4 倍，素因子越多收益越大。
+    同一密钥解密多段密文时应复用同一个对象（或通过 load_private_key 取缓存）。
+    """
+
+    __slots__ = ("n", "e", "d", "factors", "moduli", "exponents", "coefficients")
+
+    def __init__(self, factors, e):
+        counts = sorted(Counter(int(f) for f in factors).items())
+        e = gmpy2.mpz(e)
+        self.factors = tuple(p for p, k in counts for _ in range(k))
+        self.moduli = [gmpy2.mpz(p) ** k for p, k in counts]
+        self.n = gmpy2.mpz(1)
+        for r in self.moduli:
+            self.n *= r
+        self.e = e
+        self.d = gmpy2.invert(e, phi_from_factors(self.factors))
+        self.exponents = [self.d % (p ** (k - 1) * (p - 1)) for p, k in counts]
+
+        # Garner：coefficients[i] = (r_0 · r_1 ··· r_{i-1})^{-1} mod r_i
+        self.coefficients = []
+        partial = gmpy2.mpz(1)
+        for r in self.moduli:
+            self.coefficients.append(gmpy2.invert(partial, r))
+            partial *= r
+
+    @property
+    def p(self):
+        return self.factors[0]
+
+    @property
+    def q(self):
+        return self.factors[1]
+
+    def decrypt(self, c):
+        m = gmpy2.powmod(c, self.exponents[0], self.moduli[0])
+        partial = self.moduli[0]
+        for r, d_r, coef in zip(self.moduli[1:], self.exponents[1:], self.coefficients[1:]):
+            m_r = gmpy2.powmod(c, d_r, r)
+            m += (m_r - m) * coef % r * partial
+            partial *= r
+        return int(m)
+
+    def decrypt_many(self, ciphertexts):
+        return [self.decrypt(c) for c in ciphertexts]
+
+    def __repr__(self):
+        return f"RSAPrivateKey(n={int(self.n)}, e={int(self.e)}, primes={len(self.factors)})"
+
+
+@lru_cache(maxsize=64)
+def _load_private_key(factors, e):
+    return RSAPrivateKey(factors, e)
+
+
+def load_private_key(factors, e):
+    """按 (素因子, e) 缓存私钥上下文，CLI / GUI / 攻击模块重复解密时共用。"""
+    return _load_private_key(tuple(sorted(int(f) for f in factors)), int(e))
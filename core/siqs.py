@@ -0,0 +1,395 @@
+import math
+import multiprocessing
+import random
+import time
+from collections import deque
+import gmpy2
+import numpy as np
+from core.nthroot import tonelli_shanks
+from core.primes import primes_up_to
+from core.squfof import squfof, SQUFOF_MAX_BITS
+
+# ========== 自初始化二次筛 SIQS ==========
+# 对 kn（k 为 Knuth–Schroeppel 乘数）取多项式 g(x) = (A·x + B)^2 - kn = A·(A·x^2 + 2B·x + C)，
+# A 为 s 个因子基素数之积，B 的 2^(s-1) 种符号组合按 Gray 码切换，每次只需对根做一次向量加法。
+# 筛区间 [-M, M) 用 NumPy 数组累加 log p，超过阈值的位置再试除；允许一个大素数（部分关系两两合并）。
+# 线性代数：先删去含"单例列"的关系（结构化消元的剪枝步），再用按 64 位打包的 GF(2) 高斯消元求零空间。
+
+# (十进制位数上限, 因子基大小, 筛区间半宽 M)
+SIQS_PARAMETERS = [
+    (20, 80, 4096),
+    (25, 120, 8192),
+    (30, 180, 16384),
+    (35, 280, 16384),
+    (40, 450, 32768),
+    (45, 700, 32768),
+    (50, 1000, 49152),
+    (55, 1500, 65536),
+    (60, 2200, 65536),
+    (65, 3000, 98304),
+    (70, 4200, 98304),
+    (75, 5500, 131072),
+    (80, 7000, 131072),
+    (85, 9000, 196608),
+    (90, 12000, 196608),
+]
+SMALL_PRIME_LIMIT = 30        # 小于该值的素数不筛（贡献小、开销大），阈值中统一补偿
+LARGE_PRIME_FACTOR = 64       # 部分关系允许的大素数上限 = LARGE_PRIME_FACTOR · 因子基最大素数
+EXTRA_RELATIONS = 20          # 关系数超过列数的余量
+POLYS_PER_TASK = 8            # 每个任务处理的 A 个数（多进程时的粒度）
+
+
+def _parameters(n):
+    digits = len(str(n))
+    for max_digits, fb_size, M in SIQS_PARAMETERS:
+        if digits <= max_digits:
+            return fb_size, M
+    return SIQS_PARAMETERS[-1][1:]
+
+
+def _legendre(a, p):
+    return gmpy2.legendre(a, p)
+
+
+def choose_multiplier(n, candidates=(1, 3, 5, 7, 11, 13, 15, 17, 19, 21, 23, 29, 31, 33, 35, 37, 39, 41, 43, 47)):
+    """Knuth–Schroeppel：选使小素数在因子基中贡献最大的乘数 k。"""
+    best, best_score = 1, -math.inf
+    small = primes_up_to(1000)[1:]
+    for k in candidates:
+        kn = k * n
+        score = -0.5 * math.log(k)
+        r = kn % 8
+        score += 2 * math.log(2) if r == 1 else math.log(2) if r == 5 else 0.5 * math.log(2)
+        for p in small:
+            if k % p == 0:
+                score += math.log(p) / p
+            elif _legendre(kn % p, p) == 1:
+                score += 2 * math.log(p) / (p - 1)
+        if score > best_score:
+            best, best_score = k, score
+    return best
+
+
+def build_factor_base(n, kn, size):
+    """
+    返回 (primes, roots, logs)：primes[0] = 2 不参与筛，其余为使 kn 为二次剩余的奇素数，
+    roots 为 sqrt(kn) mod p。若某个小素数整除 n 则直接返回该因子。
+    """
+    primes, roots = [2], [1]
+    bound = max(1000, size * 30)
+    while True:
+        for p in primes_up_to(bound)[1:]:
+            if p <= primes[-1]:
+                continue
+            if n % p == 0:
+                return p
+            if kn % p == 0:
+                continue
+            if _legendre(kn % p, p) == 1:
+                primes.append(p)
+                roots.append(int(tonelli_shanks(kn % p, p)))
+                if len(primes) >= size:
+                    primes = np.array(primes, dtype=np.int64)
+                    return primes, np.array(roots, dtype=np.int64), np.round(np.log2(primes)).astype(np.int32)
+        bound *= 2
+
+
+def _choose_A(kn, primes, M, rng, used):
+    """随机选择 s 个因子基素数，使 A ≈ sqrt(2kn)/M；返回 (A, 素数下标列表)。"""
+    target = gmpy2.isqrt(2 * kn) // M
+    log_target = math.log2(target) if target > 1 else 1
+    lo = next(i for i, p in enumerate(primes) if p >= SMALL_PRIME_LIMIT)
+    hi = len(primes) - 1
+    # s 取使每个素数约落在因子基 2/3 分位处的个数，保证候选区间内有足够多的素数可组合
+    s = max(1, math.ceil(log_target / math.log2(primes[lo + (hi - lo) * 2 // 3])))
+    ideal = 2 ** (log_target / s)
+    # 候选素数区间：大小在 ideal 的 [1/2, 2] 倍之间
+    pool = [i for i in range(lo, hi) if ideal / 2 <= primes[i] <= ideal * 2]
+    if len(pool) < s + 2:
+        pool = list(range(lo, hi))
+    for _ in range(100):
+        chosen = rng.sample(pool, s - 1) if s > 1 else []
+        partial = 1
+        for i in chosen:
+            partial *= int(primes[i])
+        # 最后一个素数在最接近 目标/已选乘积 的几个素数中随机取（因子基很小时避免反复得到同一个 A）
+        rest = target // partial
+        nearest = sorted((i for i in range(lo, hi) if i not in chosen),
+                         key=lambda i: abs(int(primes[i]) - rest))
+        last = rng.choice(nearest[:8])
+        indices = sorted(chosen + [last])
+        A = partial * int(primes[last])
+        if A not in used:
+            used.add(A)
+            return A, indices
+    return None
+
+
+def _sieve_A(kn, primes, roots, logs, M, threshold, large_bound, rng, used):
+    """对一个 A 的全部 2^(s-1) 个多项式筛选，返回 (完全关系, 部分关系) 列表。"""
+    chosen = _choose_A(kn, primes, M, rng, used)
+    if chosen is None:
+        return [], []
+    A, a_indices = chosen
+    a_primes = [int(primes[i]) for i in a_indices]
+
+    # B_l = (A/q_l)·γ_l，γ_l = t_l·(A/q_l)^(-1) mod q_l，取较小的代表
+    B_terms = []
+    for q, idx in zip(a_primes, a_indices):
+        A_l = A // q
+        gamma = int(roots[idx]) * int(gmpy2.invert(A_l % q, q)) % q
+        if gamma > q // 2:
+            gamma = q - gamma
+        B_terms.append(A_l * gamma)
+    B = sum(B_terms)
+
+    sieve_mask = primes >= SMALL_PRIME_LIMIT
+    sieve_mask[a_indices] = False
+    sp = primes[sieve_mask]
+    st = roots[sieve_mask]
+    sl = logs[sieve_mask]
+    ainv = np.array([int(gmpy2.invert(A % int(p), int(p))) for p in sp], dtype=np.int64)
+    b_mod = np.array([B % int(p) for p in sp], dtype=np.int64)
+    r1 = (ainv * ((st - b_mod) % sp) + M) % sp
+    r2 = (ainv * ((-st - b_mod) % sp) + M) % sp
+    deltas = [np.array([2 * Bl % int(p) for p in sp], dtype=np.int64) * ainv % sp for Bl in B_terms]
+
+    small_primes = [int(p) for p in primes[1:] if p < SMALL_PRIME_LIMIT]
+    fb_index = {int(p): i for i, p in enumerate(primes)}
+    medium = sp < 2 * M
+    size = 2 * M
+    full, partial = [], []
+
+    signs = [1] * len(B_terms)
+    for gray_step in range(1 << (len(B_terms) - 1)):
+        if gray_step:
+            # Gray 码第 l 位翻转：B 中 B_l 的符号取反，根整体平移 ±2·B_l·A^(-1)
+            l = (gray_step & -gray_step).bit_length() - 1
+            signs[l] = -signs[l]
+            B += 2 * signs[l] * B_terms[l]
+            shift = deltas[l] if signs[l] < 0 else -deltas[l]
+            r1 = (r1 + shift) % sp
+            r2 = (r2 + shift) % sp
+
+        sieve = np.zeros(size, dtype=np.int32)
+        for p, a, b, lg in zip(sp[medium].tolist(), r1[medium].tolist(), r2[medium].tolist(),
+                               sl[medium].tolist()):
+            sieve[a::p] += lg
+            if a != b:
+                sieve[b::p] += lg
+        big = ~medium
+        for roots_big in (r1[big], r2[big]):
+            hit = roots_big < size
+            np.add.at(sieve, roots_big[hit], sl[big][hit])
+
+        C = (B * B - kn) // A
+        for idx in np.nonzero(sieve >= threshold)[0].tolist():
+            x = idx - M
+            v = A * x * x + 2 * B * x + C
+            exponents = {}
+            if v < 0:
+                exponents[-1] = 1
+                v = -v
+            for i in a_indices:
+                exponents[i] = exponents.get(i, 0) + 1
+            divisors = sp[((idx - r1) % sp == 0) | ((idx - r2) % sp == 0)].tolist()
+            for p in [2] + small_primes + a_primes + divisors:
+                if v % p == 0:
+                    i = fb_index[p]
+                    while v % p == 0:
+                        v //= p
+                        exponents[i] = exponents.get(i, 0) + 1
+            X = A * x + B
+            if v == 1:
+                full.append((X, exponents, 1))
+            elif v < large_bound:
+                partial.append((X, exponents, int(v)))
+    return full, partial
+
+
+def _sieve_task(args):
+    kn, primes, roots, logs, M, threshold, large_bound, seed = args
+    rng = random.Random(seed)
+    used = set()
+    full, partial = [], []
+    for _ in range(POLYS_PER_TASK):
+        f, p = _sieve_A(kn, primes, roots, logs, M, threshold, large_bound, rng, used)
+        full += f
+        partial += p
+    return full, partial
+
+
+# ---------- GF(2) 线性代数 ----------
+
+def _prune_singletons(relations, columns):
+    """反复删去含有只出现一次的列（奇数次幂）的关系，它们不可能出现在任何依赖中。"""
+    alive = list(range(len(relations)))
+    while True:
+        weight = {}
+        for r in alive:
+            for c in columns[r]:
+                weight[c] = weight.get(c, 0) + 1
+        keep = [r for r in alive if all(weight[c] > 1 for c in columns[r])]
+        if len(keep) == len(alive):
+            return keep
+        alive = keep
+
+
+def find_dependencies(columns, num_columns, limit=64):
+    """
+    columns[i] 为第 i 个关系中奇数次幂的列下标集合。先剪枝，再以 64 位打包的矩阵做 GF(2) 高斯消元，
+    返回至多 limit 个依赖（每个为关系下标列表）。
+    """
+    rows = _prune_singletons(columns, columns)
+    k = len(rows)
+    if k == 0:
+        return []
+    col_ids = sorted({c for r in rows for c in columns[r]})
+    col_pos = {c: i for i, c in enumerate(col_ids)}
+    words = (len(col_ids) + 63) // 64
+    hist_words = (k + 63) // 64
+    matrix = np.zeros((k, words), dtype=np.uint64)
+    history = np.zeros((k, hist_words), dtype=np.uint64)
+    for i, r in enumerate(rows):
+        for c in columns[r]:
+            j = col_pos[c]
+            matrix[i, j // 64] |= np.uint64(1 << (j % 64))
+        history[i, i // 64] |= np.uint64(1 << (i % 64))
+
+    is_pivot = np.zeros(k, dtype=bool)
+    for j in range(len(col_ids)):
+        bit = np.uint64(1 << (j % 64))
+        has = (matrix[:, j // 64] & bit) != 0
+        candidates = np.nonzero(has & ~is_pivot)[0]
+        if len(candidates) == 0:
+            continue
+        pivot = candidates[0]
+        is_pivot[pivot] = True
+        has[pivot] = False
+        targets = np.nonzero(has)[0]
+        if len(targets):
+            matrix[targets] ^= matrix[pivot]
+            history[targets] ^= history[pivot]
+
+    dependencies = []
+    for i in np.nonzero(~is_pivot)[0]:
+        members = [rows[t] for t in range(k) if (int(history[i, t // 64]) >> (t % 64)) & 1]
+        if members:
+            dependencies.append(members)
+            if len(dependencies) >= limit:
+                break
+    return dependencies
+
+
+# ---------- 主流程 ----------
+
+def _combine_partials(partials, pending):
+    """同一大素数的两个部分关系相乘得到一个完全关系（大素数成为平方，记入 Y）。"""
+    combined = []
+    for X, exponents, large in partials:
+        if large in pending:
+            X0, e0, _ = pending[large]
+            merged = dict(e0)
+            for c, v in exponents.items():
+                merged[c] = merged.get(c, 0) + v
+            combined.append((X0 * X, merged, large))
+        else:
+            pending[large] = (X, exponents, large)
+    return combined
+
+
+def siqs_factor(n, max_digits=90, workers=None, timeout=None, verbose=False):
+    """
+    自初始化二次筛分解 n。62 位以下交给 SQUFOF。纯 Python 实现，单核实测 45 位约 7 秒、
+    50 位约 25 秒、55 位约 85 秒、60 位以上需要数十分钟，参数表虽延伸到 90 位，实际只适合 55 位以内。
+    workers > 1 时筛选阶段分散到进程池（同时在途的任务数为 2·workers）；
+    timeout 为秒数上限。成功返回 (p, q)，否则 None。
+    """
+    n = gmpy2.mpz(n)
+    if n < 4 or gmpy2.is_prime(n):
+        return None
+    if n % 2 == 0:
+        return 2, int(n // 2)
+    if n.bit_length() <= SQUFOF_MAX_BITS:
+        return squfof(n)
+    if len(str(n)) > max_digits:
+        return None
+    for e in range(2, n.bit_length()):
+        root, exact = gmpy2.iroot(n, e)
+        if exact:
+            return int(root), int(n // root)
+        if root < 3:
+            break
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    k = choose_multiplier(int(n))
+    kn = k * n
+    fb_size, M = _parameters(n)
+    fb = build_factor_base(n, kn, fb_size)
+    if not isinstance(fb, tuple):
+        return fb, int(n // fb)
+    primes, roots, logs = fb
+    pmax = int(primes[-1])
+    large_bound = min(pmax * LARGE_PRIME_FACTOR, pmax * pmax)
+    # log2 |g(x)/A| 在区间上约为 log2(M·sqrt(kn/2))；减去允许的大素数与未筛小素数的余量
+    threshold = int(math.log2(M * math.sqrt(kn / 2)) - math.log2(large_bound) - 2 * math.log2(SMALL_PRIME_LIMIT))
+
+    needed = len(primes) + 1 + EXTRA_RELATIONS
+    relations, pending, seen = [], {}, set()
+    workers = workers or 1
+    seed = random.randrange(1 << 30)
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+
+    def task(i):
+        return int(kn), primes, roots, logs, M, threshold, large_bound, seed + i
+
+    def results():
+        i = 0
+        if pool is None:
+            while True:
+                yield _sieve_task(task(i))
+                i += 1
+        # 只保持有限个任务在途（imap 会把无限任务流一次性塞进队列）
+        queue = deque()
+        while True:
+            while len(queue) < 2 * workers:
+                queue.append(pool.apply_async(_sieve_task, (task(i),)))
+                i += 1
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            yield queue.popleft().get(remaining)
+
+    try:
+        for full, partial in results():
+            for rel in full + _combine_partials(partial, pending):
+                if rel[0] not in seen:
+                    seen.add(rel[0])
+                    relations.append(rel)
+            if verbose:
+                print(f"⏳ SIQS: {len(relations)}/{needed} 条关系")
+            if len(relations) >= needed:
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+    except multiprocessing.TimeoutError:
+        return None
+    finally:
+        if pool:
+            pool.terminate()
+
+    columns = [{c for c, v in rel[1].items() if v % 2} for rel in relations]
+    for members in find_dependencies(columns, len(primes) + 1):
+        X, Y = gmpy2.mpz(1), gmpy2.mpz(1)
+        total = {}
+        for i in members:
+            Xi, exponents, large = relations[i]
+            X = X * Xi % n
+            Y = Y * large % n
+            for c, v in exponents.items():
+                total[c] = total.get(c, 0) + v
+        for c, v in total.items():
+            if c != -1:
+                Y = Y * gmpy2.powmod(int(primes[c]), v // 2, n) % n
+        g = gmpy2.gcd(X - Y, n)
+        if 1 < g < n:
+            return int(g), int(n // g)
+    return None
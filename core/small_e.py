@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from math import gcd
+import gmpy2
+from core.primes import primes_up_to
+
+# ========== 小 e 攻击：c + k·n 的剩余筛 ==========
+# m^e = c + k·n 要求 c + k·n 模任意小素数 l 都是 e 次剩余；当 gcd(e, l-1) > 1 时
+# e 次剩余只占约 1/gcd(e, l-1)，据此可在开根前排除绝大多数 k。
+
+WHEEL_LIMIT = 1 << 21        # 轮子模数上限，决定每轮枚举的剩余类数量
+FILTER_PRIMES = 16           # 轮子之外再用于逐个过滤的素数个数
+CHUNK_SIZE = 1 << 24         # 并行时每个任务负责的 k 区间长度
+
+
+def _allowed_k(n, e, c, l):
+    """返回长度为 l 的表：allowed[k mod l] 为真当且仅当 c + k·n 模 l 是 e 次剩余。"""
+    powers = {pow(x, e, l) for x in range(l)}
+    cl, nl = c % l, n % l
+    return bytes((cl + k * nl) % l in powers for k in range(l))
+
+
+@lru_cache(maxsize=8)
+def build_sieve(n, e, c):
+    """
+    返回 (wheel, residues, filters)：k mod wheel 必须落在 residues 中，
+    且对 filters 中每个 (l, allowed) 都有 allowed[k mod l] 为真。
+    """
+    useful = [l for l in primes_up_to(5000) if gcd(e, l - 1) > 1 and n % l]
+    wheel, residues = 1, [0]
+    filters = []
+    for l in useful:
+        allowed = _allowed_k(n, e, c, l)
+        if wheel * l <= WHEEL_LIMIT:
+            inv = pow(wheel, -1, l)
+            residues = [r + wheel * ((a - r) * inv % l)
+                        for r in residues for a in range(l) if allowed[a]]
+            wheel *= l
+        elif len(filters) < FILTER_PRIMES:
+            filters.append((l, allowed))
+        else:
+            break
+    residues.sort()
+    return wheel, residues, tuple(filters)
+
+
+def search_k_range(n, e, c, k_start, k_end):
+    """在 [k_start, k_end) 中寻找使 c + k·n 为完全 e 次方的 k，返回 (k, m) 或 None。"""
+    wheel, residues, filters = build_sieve(n, e, c)
+    n, c = gmpy2.mpz(n), gmpy2.mpz(c)
+    base = k_start - k_start % wheel
+    while base < k_end:
+        for r in residues:
+            k = base + r
+            if k < k_start:
+                continue
+            if k >= k_end:
+                return None
+            if not all(allowed[k % l] for l, allowed in filters):
+                continue
+            m, exact = gmpy2.iroot(c + k * n, e)
+            if exact:
+                return k, int(m)
+        base += wheel
+    return None
+
+
+def search_small_e(n, e, c, k_max=100000, k_min=1, workers=None):
+    """
+    并行搜索 k ∈ [k_min, k_max)：区间按 CHUNK_SIZE 切块分给进程池，任一块命中即取消其余块。
+    返回 (k, m) 或 None。
+    """
+    n, e, c = int(n), int(e), int(c)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = [(lo, min(lo + CHUNK_SIZE, k_max)) for lo in range(k_min, k_max, CHUNK_SIZE)]
+    if workers <= 1 or len(chunks) <= 1:
+        for lo, hi in chunks:
+            found = search_k_range(n, e, c, lo, hi)
+            if found:
+                return found
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(search_k_range, n, e, c, lo, hi) for lo, hi in chunks}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found = future.result()
+                    if found:
+                        return found
+        finally:
+            for future in pending:
+                future.cancel()
+    return None
@@ -0,0 +1,70 @@
+import gmpy2
+
+# ========== SQUFOF（Shanks 平方型分解） ==========
+# 基于 sqrt(kn) 连分数展开中出现的平方型，只需 O(n^(1/4)) 次单字长运算，
+# 适合 62 位以下的合数（例如 SIQS / ECM 剩下的小余因子）。
+
+SQUFOF_MAX_BITS = 62
+MULTIPLIERS = (1, 3, 5, 7, 11, 3 * 5, 3 * 7, 3 * 11, 5 * 7, 5 * 11, 7 * 11,
+               3 * 5 * 7, 3 * 5 * 11, 3 * 7 * 11, 5 * 7 * 11, 3 * 5 * 7 * 11)
+
+
+def _squfof_multiplier(n, k):
+    D = k * n
+    p0 = gmpy2.isqrt(D)
+    q_prev, q = 1, D - p0 * p0
+    if q == 0:
+        return None
+    p = p_prev = p0
+    bound = 3 * 2 * gmpy2.isqrt(2 * gmpy2.isqrt(n))
+
+    # 正向循环：寻找偶数下标处的平方型 Q_i = r^2
+    i = 2
+    while i < bound:
+        b = (p0 + p) // q
+        p = b * q - p
+        q_next = q_prev + b * (p_prev - p)
+        q_prev, q = q, q_next
+        if i % 2 == 0 and gmpy2.is_square(q):
+            break
+        p_prev = p
+        i += 1
+    else:
+        return None
+
+    # 反向循环：从平方根约化型出发，直到 P 不再变化
+    r = gmpy2.isqrt(q)
+    b = (p0 - p) // r
+    p = b * r + p
+    q_prev = r
+    q = (D - p * p) // q_prev
+    if q == 0:
+        return None
+    while True:
+        b = (p0 + p) // q
+        p_prev, p = p, b * q - p
+        q_next = q_prev + b * (p_prev - p)
+        q_prev, q = q, q_next
+        if p == p_prev:
+            break
+    g = gmpy2.gcd(n, q_prev)
+    if 1 < g < n:
+        return int(g), int(n // g)
+    return None
+
+
+def squfof(n, multipliers=MULTIPLIERS):
+    """SQUFOF 分解，n 超过 SQUFOF_MAX_BITS 位时直接返回 None。"""
+    n = gmpy2.mpz(n)
+    if n.bit_length() > SQUFOF_MAX_BITS or n < 4 or gmpy2.is_prime(n):
+        return None
+    if n % 2 == 0:
+        return 2, int(n // 2)
+    root, exact = gmpy2.iroot(n, 2)
+    if exact:
+        return int(root), int(root)
+    for k in multipliers:
+        found = _squfof_multiplier(n, k)
+        if found:
+            return found
+    return None
@@ -16,6 +16,12 @@ def parse_input_int(s):
     else:
         return int(s)
 
+def parse_input_int_list(s):
+    """
+    解析以逗号或空白分隔的多个整数（每个都支持 parse_input_int 的进制前缀），空串返回空列表。
+    """
+    return [parse_input_int(x) for x in s.replace(",", " ").split()]
+
 def display_decryption(m, mode=3):
     decrypted_bytes = long_to_bytes(m)
 
@@ -1,4 +1,5 @@
 import gmpy2
+from core.cache import remember_factors
 
 def continued_fraction(n, d):
     """生成 n/d 的连分数展开"""
@@ -8,31 +9,41 @@ def continued_fraction(n, d):
         n, d = d, n - a * d
 
 def convergents(cf):
-    """从连分数构造逼近（收敛项）"""
-    convs = []
-    for i in range(len(cf)):
-        num, denom = 1, 0
-        for a in reversed(cf[:i+1]):
-            num, denom = denom + num * a, num
-        convs.append((num, denom))
-    return convs
+    """
+    从连分数（任意可迭代对象，可以是生成器）惰性生成逼近（收敛项）。
+    使用递推 h_i = a_i·h_{i-1} + h_{i-2}，k_i = a_i·k_{i-1} + k_{i-2}，每项 O(1) 次大整数运算。
+    """
+    h_prev, h = 0, 1
+    k_prev, k = 1, 0
+    for a in cf:
+        h_prev, h = h, a * h + h_prev
+        k_prev, k = k, a * k + k_prev
+        yield h, k
 
 def is_perfect_square(n):
     root = gmpy2.isqrt(n)
     return root * root == n
 
-def wiener_attack(e, n):
-    cf = list(continued_fraction(e, n))
-    for k, d in convergents(cf):
-        if k == 0:
+def wiener_attack(e, n, witness=2):
+    """
+    边展开 e/n 的连分数边检验收敛项 k/d，找到 d 立即返回，不再生成整个展开。
+    候选 d 先用一次试解密 witness^(e·d) ≡ witness (mod n) 过滤，再解二次方程恢复 p, q。
+    """
+    e, n = gmpy2.mpz(e), gmpy2.mpz(n)
+    for k, d in convergents(continued_fraction(e, n)):
+        if k == 0 or d % 2 == 0:
             continue
         # phi = (ed - 1) / k must be integer
         if (e * d - 1) % k != 0:
             continue
+        if gmpy2.powmod(witness, e * d, n) != witness % n:
+            continue
         phi = (e * d - 1) // k
         # Solve for p and q from phi and n
         s = n - phi + 1
         discrim = s * s - 4 * n
         if discrim >= 0 and is_perfect_square(discrim):
-            return d
+            root = gmpy2.isqrt(discrim)
+            remember_factors(n, (int((s - root) // 2), int((s + root) // 2)), "Wiener")
+            return int(d)
     return None
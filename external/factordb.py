@@ -1,32 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def factordb_lookup(n):
-    try:
-        print("🌐 查询 FactorDB API 分解 n ...")
-        response = requests.get(f"https://factordb.com/api?query={n}")
-        data = response.json()
+# 测试或离线时可将 FACTORDB_URL 指向本地替身服务（见 external/factordb_mock.py）
+FACTORDB_URL = os.environ.get("FACTORDB_URL", "https://factordb.com/api")
+DEFAULT_TIMEOUT = 15
+MIN_INTERVAL = 0.2
+RESPONSE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".rsa_tool", "factordb.sqlite3")
 
-        if data['status'] != 'FF' and data['status'] != 'CF':
-            print("❌ FactorDB 无法确认分解，状态:", data['status'])
-            return None
+# 只有这些状态是确定结论，可以长期缓存（FF: 完全分解，P/PRP: 素数）
+_FINAL_STATUSES = {"FF", "P", "PRP"}
+
+
+class FactorDBClient:
+    """
+    FactorDB API 客户端：共享 Session 连接池、请求超时、全局限速，
+    429/5xx 自动指数退避重试，确定结论的响应缓存在本地磁盘。
+    """
+
+    def __init__(self, base_url=None, timeout=DEFAULT_TIMEOUT, min_interval=MIN_INTERVAL,
+                 cache_path=RESPONSE_CACHE_PATH, pool_size=8, retries=4):
+        self.base_url = base_url or FACTORDB_URL
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._next_request = 0.0
 
-        factors = data['factors']
-        if len(factors) != 2:
-            print("❌ FactorDB 返回的因子数量异常:", len(factors))
+        retry = Retry(total=retries, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if cache_path:
+            directory = os.path.dirname(cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS responses (n TEXT PRIMARY KEY, body TEXT NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.cache_path, timeout=10)
+
+    def _cached(self, n):
+        if not self.cache_path:
             return None
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT body FROM responses WHERE n = ?", (str(n),)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def _store(self, n, data):
+        if not self.cache_path or data.get("status") not in _FINAL_STATUSES:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO responses (n, body) VALUES (?, ?)",
+                             (str(n), json.dumps(data)))
+        finally:
+            conn.close()
 
-        p, _ = factors[0]
-        q, _ = factors[1]
-        p = int(p)
-        q = int(q)
+    def _throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_request - now
+            self._next_request = max(now, self._next_request) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
 
-        if p * q == n:
-            print(f"✅ FactorDB 分解成功:\np = {p}\nq = {q}")
-            return p, q
-        else:
+    def query(self, n):
+        """返回 FactorDB 的原始 JSON 响应（字典）。"""
+        n = int(n)
+        data = self._cached(n)
+        if data is not None:
+            return data
+        self._throttle()
+        response = self.session.get(self.base_url, params={"query": str(n)}, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        self._store(n, data)
+        return data
+
+    def factors(self, n):
+        """
+        返回 n 的素因子列表（含重数）；FactorDB 未完全分解时返回 None。
+        """
+        n = int(n)
+        data = self.query(n)
+        if data.get("status") not in ("FF", "CF"):
+            print("❌ FactorDB 无法确认分解，状态:", data.get("status"))
+            return None
+        factors = []
+        for value, exponent in data.get("factors", []):
+            factors.extend([int(value)] * int(exponent))
+        product = 1
+        for f in factors:
+            product *= f
+        if product != n:
             print("⚠️ FactorDB 因子不匹配原始 n。")
             return None
+        if data["status"] == "CF":
+            print("⚠️ FactorDB 仅部分分解（CF），结果中可能含合数。")
+        return sorted(factors)
+
+    def factors_many(self, moduli, workers=4):
+        """批量查询：并发请求（仍受全局限速约束），返回 {n: 因子列表或 None}。"""
+        moduli = [int(n) for n in moduli]
+
+        def lookup(n):
+            try:
+                return self.factors(n)
+            except (requests.RequestException, ValueError) as e:
+                print(f"❌ FactorDB 查询 {n} 失败: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(moduli, executor.map(lookup, moduli)))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FactorDBClient()
+        return _client
+
+
+def factordb_lookup_many(moduli, workers=4):
+    return get_client().factors_many(moduli, workers)
+
+
+def factordb_lookup(n):
+    try:
+        print("🌐 查询 FactorDB API 分解 n ...")
+        factors = get_client().factors(n)
+        if not factors or len(factors) < 2:
+            return None
+
+        print(f"✅ FactorDB 分解成功: {factors}")
+        return tuple(factors)
 
     except Exception as e:
         print(f"❌ FactorDB API 请求失败: {e}")
-        return None
\ No newline at end of file
+        return None
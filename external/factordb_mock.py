@@ -0,0 +1,87 @@
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# ========== FactorDB 本地替身服务 ==========
+# 用于测试和离线环境：按 FactorDB /api 的响应格式返回预先登记的分解结果。
+# 使用方式：FACTORDB_URL=http://127.0.0.1:8765/api python main.py
+
+
+def _response(n, known):
+    factors = known.get(n)
+    if factors:
+        counts = {}
+        for f in factors:
+            counts[f] = counts.get(f, 0) + 1
+        status = "P" if len(factors) == 1 else "FF"
+        return {"id": str(n), "status": status,
+                "factors": [[str(f), e] for f, e in sorted(counts.items())]}
+    return {"id": str(n), "status": "C", "factors": [[str(n), 1]]}
+
+
+def make_handler(known):
+    class FactorDBHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query).get("query")
+            if url.path.rstrip("/") != "/api" or not query:
+                self.send_error(404)
+                return
+            try:
+                n = int(query[0])
+            except ValueError:
+                self.send_error(400)
+                return
+            body = json.dumps(_response(n, known)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FactorDBHandler
+
+
+def serve_mock(known, host="127.0.0.1", port=0):
+    """
+    在后台线程启动替身服务，known 为 {n: [素因子, ...]}。
+    返回 (server, api_url)，用完调用 server.shutdown()。
+    """
+    known = {int(n): [int(f) for f in factors] for n, factors in known.items()}
+    server = ThreadingHTTPServer((host, port), make_handler(known))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/api"
+
+
+def load_known(path):
+    """读取分解表文件：每行 'n p q ...'，空行和 # 开头的行忽略。"""
+    known = {}
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            n, *factors = (int(x, 0) for x in line.split())
+            known[n] = factors
+    return known
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the FactorDB API")
+    parser.add_argument("-f", "--file", help="Factor table, one 'n p q ...' per line")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server, url = serve_mock(load_known(args.file) if args.file else {}, args.host, args.port)
+    print(f"FactorDB mock listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,32 +1,208 @@
+import asyncio
+import os
 import re
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
 
-def yafu_factor(n, path=".\external\yafu-1.34\yafu-x64.exe"):
+YAFU_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "yafu-1.34")
+YAFU_INI = os.path.join(YAFU_DIR, "yafu.ini")
+
+# yafu.ini 中可以原样转成命令行参数的选项（YAFU 只在工作目录下读取 ini，这里显式传参）
+INI_OPTIONS = ("threads", "plan", "pretest_ratio", "B1pm1", "B1pp1", "B1ecm", "rhomax")
+
+_FACTOR_LINE = re.compile(r'^\s*(PRP|P|C)\d+\s*=\s*(\d+)')
+
+
+def find_yafu():
+    """
+    查找 YAFU 可执行文件：环境变量 YAFU_PATH > 随仓库附带的对应平台二进制 > PATH 中的 yafu。
+    """
+    env_path = os.environ.get("YAFU_PATH")
+    if env_path:
+        return env_path
+
+    if sys.platform.startswith("win"):
+        names = ["yafu-x64.exe", "yafu-Win32.exe"]
+    else:
+        names = ["yafu"]
+    for name in names:
+        candidate = os.path.join(YAFU_DIR, name)
+        if os.path.isfile(candidate):
+            return candidate
+
+    return shutil.which("yafu")
+
+
+def read_yafu_ini(path=YAFU_INI):
+    """解析 yafu.ini，返回 {选项: 值}；以 % 开头的行为注释。"""
+    options = {}
+    try:
+        with open(path, "r", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("%") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                options[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return options
+
+
+def build_command(n, path=None, threads=None, plan=None, ini_path=YAFU_INI):
+    """构造 YAFU 参数列表（不经过 shell）；threads / plan 覆盖 yafu.ini 中的同名设置。"""
+    path = path or find_yafu()
+    if not path:
+        raise FileNotFoundError("未找到 YAFU 可执行文件，可通过环境变量 YAFU_PATH 指定")
+
+    options = read_yafu_ini(ini_path)
+    if threads is not None:
+        options["threads"] = threads
+    if plan is not None:
+        options["plan"] = plan
+
+    cmd = [path, f"factor({n})"]
+    for key in INI_OPTIONS:
+        if key in options:
+            cmd += [f"-{key}", str(options[key])]
+    return cmd
+
+
+class _FactorCollector:
+    """逐行解析 YAFU 输出，收集 '***factors found***' 之后的 P/PRP/C 行。"""
+
+    def __init__(self):
+        self.found = False
+        self.primes = []
+        self.composites = []
+
+    def feed(self, line):
+        if "factors found" in line:
+            self.found = True
+            self.primes, self.composites = [], []
+            return
+        if not self.found:
+            return
+        match = _FACTOR_LINE.match(line)
+        if match:
+            kind, value = match.groups()
+            (self.composites if kind == "C" else self.primes).append(int(value))
+
+    def result(self, n):
+        if not self.primes:
+            print("⚠️ YAFU 输出中未找到因子。")
+            return None
+        if self.composites:
+            print(f"⚠️ YAFU 只完成了部分分解，剩余合数: {self.composites}")
+            return None
+        product = 1
+        for p in self.primes:
+            product *= p
+        if product != n:
+            print("⚠️ 警告：提取的因子乘积不等于 n。")
+            return None
+        return sorted(self.primes)
+
+
+def yafu_factor_all(n, path=None, timeout=180, threads=None, plan=None, cancel_event=None, on_line=print):
+    """
+    运行 YAFU 并逐行流式解析输出，返回 n 的完整素因子列表（含重数），失败返回 None。
+    timeout 秒后或 cancel_event 被设置时结束子进程。
+    """
     try:
-        cmd = f'{path} factor({n})'
-        print(f"\n🛠 正在运行命令: {cmd}\n")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=180)
+        cmd = build_command(n, path, threads, plan)
+    except FileNotFoundError as e:
+        print(f"❌ 调用 YAFU 失败：{e}")
+        return None
+
+    print(f"\n🛠 正在运行命令: {' '.join(cmd)}\n")
+    collector = _FactorCollector()
+    stopped = threading.Event()
+
+    # YAFU 会在工作目录写 session.log / siqs.dat 等文件，放到临时目录里
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            proc = subprocess.Popen(cmd, cwd=workdir, stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    text=True, errors="replace")
+        except OSError as e:
+            print(f"❌ 调用 YAFU 失败：{e}")
+            return None
+
+        def watchdog():
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while proc.poll() is None:
+                if (cancel_event is not None and cancel_event.is_set()) or \
+                        (deadline is not None and time.monotonic() > deadline):
+                    stopped.set()
+                    proc.kill()
+                    return
+                time.sleep(0.1)
+
+        threading.Thread(target=watchdog, daemon=True).start()
 
-        # 打印原始输出，便于调试
         print("=" * 20 + "📤 YAFU 输出开始" + "=" * 20)
-        print(result.stdout)
+        for line in proc.stdout:
+            if on_line:
+                on_line(line.rstrip("\n"))
+            collector.feed(line)
+        proc.wait()
         print("=" * 20 + "📤 YAFU 输出结束" + "=" * 20 + "\n")
 
-        output = result.stdout
-
-        # 提取所有 Pxx = number 的因子
-        factors = re.findall(r'P\d+\s*=\s*(\d+)', output)
-
-        if len(factors) >= 2:
-            p = int(factors[0])
-            q = int(factors[1])
-            if p * q == n:
-                print(f"✅ 成功提取因子:\np = {p}\nq = {q}")
-                return p, q
-            else:
-                print(f"⚠️ 警告：提取的因子乘积不等于 n。")
-        else:
-            print(f"⚠️ 未找到足够的因子 (找到 {len(factors)})。")
-    except Exception as e:
+    if stopped.is_set():
+        print("⚠️ YAFU 已超时或被取消。")
+        return None
+    return collector.result(n)
+
+
+async def yafu_factor_async(n, path=None, timeout=180, threads=None, plan=None, on_line=None):
+    """
+    yafu_factor_all 的 asyncio 版本；任务被取消或超时时结束子进程。
+    """
+    try:
+        cmd = build_command(n, path, threads, plan)
+    except FileNotFoundError as e:
         print(f"❌ 调用 YAFU 失败：{e}")
-    return None
\ No newline at end of file
+        return None
+
+    collector = _FactorCollector()
+    with tempfile.TemporaryDirectory() as workdir:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=workdir, stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+
+        async def pump():
+            while True:
+                raw = await proc.stdout.readline()
+                if not raw:
+                    break
+                line = raw.decode(errors="replace")
+                if on_line:
+                    on_line(line.rstrip("\n"))
+                collector.feed(line)
+            await proc.wait()
+
+        try:
+            await asyncio.wait_for(pump(), timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ YAFU 已超时。")
+            return None
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+    return collector.result(n)
+
+
+def yafu_factor(n, path=None, timeout=180, threads=None, plan=None):
+    """分解流水线使用的入口：返回全部素因子组成的元组。"""
+    factors = yafu_factor_all(n, path, timeout, threads, plan)
+    if not factors:
+        return None
+    print(f"✅ 成功提取因子: {factors}")
+    return tuple(factors)
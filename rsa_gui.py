@@ -3,16 +3,16 @@ from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
 from core.attacks import (
     decrypt_small_e_case, common_modulus_attack, decrypt_common_modulus,
-    recover_p_from_high_bits
+    recover_p_from_high_bits, hastad_broadcast_attack
 )
 from core.decrypt import (
     decrypt_standard, decrypt_with_phi, decrypt_with_d, decrypt_with_factoring
 )
 from core.factoring import factor_n
 from core.keygen import gen_keys, encrypt
+from core.rsa_key import load_private_key
 from core.utils import parse_input_int, display_decryption, check_message_length
 from core.wiener import wiener_attack
-import libnum
 from Crypto.PublicKey import RSA
 from Crypto.Cipher import PKCS1_OAEP
 import time
@@ -289,7 +289,7 @@ class RSAToolGUI:
         methods = [
             ("标准模式 (p, q, e, c)", "standard"),
             ("已知 φ(n) (n, e, φ(n), c)", "phi"),
-            ("已知私钥 d (n, d, c)", "d"),
+            ("已知私钥 d (n, d, c, 可选 e)", "d"),
             ("自动分解 n (n, e, c)", "factoring")
         ]
         
@@ -367,7 +367,8 @@ class RSAToolGUI:
             ("共模攻击 (相同 n)", "common_modulus"),
             ("共模攻击 (相同 e)", "common_e"),
             ("高位泄露攻击", "high_bits"),
-            ("Wiener 攻击", "wiener")
+            ("Wiener 攻击", "wiener"),
+            ("广播攻击", "hastad")
         ]
         
         for text, mode in methods:
@@ -390,7 +391,8 @@ class RSAToolGUI:
             ("c1", "密文 c1:"),
             ("c2", "密文 c2:"),
             ("p_high", "p 的高位:"),
-            ("bit_len", "高位位数:")
+            ("bit_len", "未知低位位数:"),
+            ("pairs", "广播 n:c;..:")
         ]
         
         for i, (field, label) in enumerate(fields):
@@ -594,6 +596,8 @@ class RSAToolGUI:
             elif method == "d":
                 params["n"] = parse_input_int(self.dec_entries["n"].get())
                 params["d"] = parse_input_int(self.dec_entries["d"].get())
+                e_text = self.dec_entries["e"].get().strip()
+                params["e"] = parse_input_int(e_text) if e_text else None
                 params["c"] = parse_input_int(self.dec_entries["c"].get())
             elif method == "factoring":
                 params["n"] = parse_input_int(self.dec_entries["n"].get())
@@ -614,7 +618,7 @@ class RSAToolGUI:
             elif method == "phi":
                 m = decrypt_with_phi(params["n"], params["e"], params["phi"], params["c"])
             elif method == "d":
-                m = decrypt_with_d(params["n"], params["d"], params["c"])
+                m = decrypt_with_d(params["n"], params["d"], params["c"], params["e"])
             elif method == "factoring":
                 # 这里简化处理，实际应用中需要实现自动分解
                 m = decrypt_with_factoring(params["n"], params["e"], params["c"])
@@ -665,6 +669,12 @@ class RSAToolGUI:
             elif method == "wiener":
                 params["n"] = parse_input_int(self.attack_entries["n1"].get())
                 params["e"] = parse_input_int(self.attack_entries["e1"].get())
+            elif method == "hastad":
+                # 格式：n1:c1;n2:c2;...，指数取 e1
+                params["e"] = parse_input_int(self.attack_entries["e1"].get())
+                pairs = [item.split(":") for item in self.attack_entries["pairs"].get().split(";") if item.strip()]
+                params["moduli"] = [parse_input_int(n) for n, _ in pairs]
+                params["ciphertexts"] = [parse_input_int(c) for _, c in pairs]
             
             # 在后台线程中执行攻击
             threading.Thread(target=self._perform_attack, args=(method, params)).start()
@@ -698,6 +708,12 @@ class RSAToolGUI:
                     result += f"✅ Wiener 攻击成功！恢复的私钥 d: {d}\n"
                 else:
                     result += "❌ Wiener 攻击失败\n"
+            elif method == "hastad":
+                m = hastad_broadcast_attack(params["e"], params["moduli"], params["ciphertexts"])
+                if m is not None:
+                    result += f"✅ 广播攻击成功！恢复的明文: {m}\n"
+                else:
+                    result += "❌ 广播攻击失败\n"
             
             self.attack_result_text.configure(state=tk.NORMAL)
             self.attack_result_text.delete(1.0, tk.END)
@@ -732,23 +748,24 @@ class RSAToolGUI:
         try:
             # 尝试读取 p 和 q，如果为空则自动触发分解
             if p_str and q_str:
-                p = parse_input_int(p_str)
-                q = parse_input_int(q_str)
+                factors = [parse_input_int(p_str), parse_input_int(q_str)]
                 self.log("✅ 已输入 p 和 q，将使用它们解密文件。")
             else:
                 self.log("🔍 未提供 p 和 q，尝试自动分解 n ...")
                 factors = factor_n(n)
                 if not factors:
                     raise Exception("分解失败，无法解密")
-                p, q = factors
-                self.log(f"✅ 分解成功: p = {p}, q = {q}")
+                self.log(f"✅ 分解成功: {' × '.join(map(str, factors))}")
+            
+            if len(factors) != 2 or factors[0] == factors[1]:
+                raise Exception("OAEP 文件解密只支持两个不同素数的密钥")
+            p, q = factors
             
-            # 计算私钥
-            phi = (p - 1) * (q - 1)
-            d = libnum.invmod(e, phi)
+            # 计算私钥（CRT 上下文按素因子和 e 缓存复用）
+            key = load_private_key(factors, e)
             
             # 构造私钥并解密
-            private_key = RSA.construct((n, e, d, p, q))
+            private_key = RSA.construct((n, e, int(key.d), p, q))
             rsa = PKCS1_OAEP.new(private_key)
             
             with open(file_path, 'rb') as f: